@@ -0,0 +1,111 @@
+"""Compare populate with and without trusted_populate on a large synthetic zone.
+
+    python benchmarks/populate.py [--records 100000] [--repeat 5]
+
+Every mode gets an untimed warm-up run, then the modes are timed in turns,
+``--repeat`` times each, with a fresh provider and a ``gc.collect()`` before
+every timed populate so no run pays for the garbage of the previous one. The
+minimum and median are reported.
+"""
+
+import argparse
+import gc
+import logging
+import statistics
+import time
+from unittest.mock import MagicMock, patch
+
+from octodns.zone import Zone
+
+from octodns_exoscale import ExoscaleProvider
+
+ZONE_NAME = "example.com."
+
+
+def _api_records(count):
+    templates = [
+        ("A", lambda i: f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", None),
+        ("AAAA", lambda i: f"2001:db8::{i >> 16:x}:{i & 0xffff:x}", None),
+        ("CNAME", lambda i: f"target{i}.example.com", None),
+        ("MX", lambda i: f"mx{i}.example.com", 10),
+        ("TXT", lambda i: f"v=spf1 include:spf{i}.example.com ~all", None),
+        ("SRV", lambda i: f"10 5060 sip{i}.example.com", 10),
+        ("CAA", lambda i: '0 issue "letsencrypt.org"', None),
+    ]
+    records = []
+    for i in range(count):
+        _type, content, priority = templates[i % len(templates)]
+        record = {
+            "id": f"r-{i}",
+            "name": f"_sip._udp.host{i}" if _type == "SRV" else f"host{i}",
+            "type": _type,
+            "content": content(i),
+            "ttl": 300,
+        }
+        if priority is not None:
+            record["priority"] = priority
+        records.append(record)
+    return records
+
+
+def _provider(api_records, **kwargs):
+    mock_client = MagicMock()
+    mock_client.list_dns_domains.return_value = {
+        "dns-domains": [{"id": "zone-id", "unicode-name": ZONE_NAME[:-1]}]
+    }
+    mock_client.list_dns_domain_records.return_value = {"dns-domain-records": api_records}
+    with patch("octodns_exoscale.Client", return_value=mock_client):
+        provider = ExoscaleProvider("bench", "key", "secret", "ch-gva-2", **kwargs)
+    provider.zone_records(Zone(ZONE_NAME, []))
+    return provider
+
+
+def _populate(api_records, **kwargs):
+    provider = _provider(api_records, **kwargs)
+    zone = Zone(ZONE_NAME, [])
+    gc.collect()
+    start = time.perf_counter()
+    provider.populate(zone)
+    return time.perf_counter() - start, len(zone.records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--sample", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    api_records = _api_records(args.records)
+    runs = (
+        ("validated", {}),
+        ("trusted", {"trusted_populate": True}),
+        (
+            f"trusted, {args.sample:.0%} sampled",
+            {"trusted_populate": True, "trusted_validation_sample": args.sample},
+        ),
+    )
+
+    for _, kwargs in runs:
+        _populate(api_records, data_cache_size=0, **kwargs)
+
+    timings = {label: [] for label, _ in runs}
+    counts = {}
+    for i in range(args.repeat):
+        # rotate the order so no mode always runs first or last
+        for label, kwargs in runs[i % len(runs) :] + runs[: i % len(runs)]:
+            seconds, counts[label] = _populate(api_records, data_cache_size=0, **kwargs)
+            timings[label].append(seconds)
+
+    baseline = min(timings[runs[0][0]])
+    for label, _ in runs:
+        best = min(timings[label])
+        print(
+            f"{label:>24}: {counts[label]} records, min {best:.3f}s, "
+            f"median {statistics.median(timings[label]):.3f}s ({baseline / best:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import logging
-from collections import defaultdict
-from typing import Any, Iterator, Union
+import zlib
+from collections import Counter, defaultdict
+from copy import copy
+from typing import Any, Iterable, Iterator, Optional, Union
 
 from exoscale.api.v2 import Client
 from octodns.idna import IdnaDict
+from octodns.provider import ProviderException
 from octodns.provider.base import BaseProvider, Plan
 from octodns.record import (
     AaaaRecord,
@@ -11,6 +14,7 @@ from octodns.record import (
     CaaRecord,
     Change,
     CnameRecord,
+    Create,
     MxRecord,
     NaptrRecord,
     NsRecord,
@@ -18,9 +22,18 @@ from octodns.record import (
     SrvRecord,
     SshfpRecord,
     TxtRecord,
+    Update,
 )
 from octodns.zone import Zone
 
+from .bootstrap import Bootstrapper
+from .cache import DataCache, ZoneRecordCache
+from .cassette import RecordingClient, ReplayClient
+from .hedging import HedgedCaller, TimeoutSession
+from .profiling import Profiler
+from .scheduler import ApplyScheduler
+from .verify import PropagationVerifier
+
 
 class ExoscaleProvider(BaseProvider):
     SUPPORTS_GEO = False
@@ -41,30 +54,194 @@ class ExoscaleProvider(BaseProvider):
         )
     )
 
-    def __init__(self, id: str, auth_key: str, auth_secret: str, auth_zone: str, *args, **kwargs):
+    def __init__(
+        self,
+        id: str,
+        auth_key: str,
+        auth_secret: str,
+        auth_zone: str,
+        *args,
+        apply_workers: int = 1,
+        zone_priorities: Optional[dict[str, int]] = None,
+        profile_dir: Optional[str] = None,
+        profile_top: int = 25,
+        cassette_record: Optional[str] = None,
+        cassette_replay: Optional[str] = None,
+        cassette_latency: float = 0.0,
+        data_cache_size: int = 4096,
+        verify_propagation: Optional[dict[str, Any]] = None,
+        incremental_populate: bool = False,
+        zone_cache_max_zones: int = 0,
+        zone_cache_max_records: int = 0,
+        list_deadline: Optional[float] = None,
+        run_deadline: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 10,
+        http_timeout: Optional[float] = None,
+        trusted_populate: bool = False,
+        trusted_validation_sample: float = 0.0,
+        bootstrap: Optional[dict[str, Any]] = None,
+        **kwargs,
+    ):
         self.log = logging.getLogger(f"ExoscaleProvider[{id}]")
-        self.log.debug("__init__: id=%s, key=%s", id, auth_key)
+        self.log.debug("__init__: id=%s, key=%s, apply_workers=%d", id, auth_key, apply_workers)
         super().__init__(id, *args, **kwargs)
-        self._client = Client(auth_key, auth_secret, zone=auth_zone)
+        if cassette_replay:
+            self._client = ReplayClient(cassette_replay, latency=cassette_latency)
+        else:
+            self._client = Client(auth_key, auth_secret, zone=auth_zone)
+            # applies to writes as well, so it's never derived from list_deadline:
+            # a write that times out on our side may still have happened
+            if http_timeout:
+                session = TimeoutSession(http_timeout)
+                session.auth = self._client.http_client.auth
+                self._client.http_client = session
+            if cassette_record:
+                self._client = RecordingClient(
+                    self._client, cassette_record, scrub=(auth_key, auth_secret)
+                )
+        self.apply_workers = apply_workers
+        self.zone_priorities = zone_priorities or {}
+        self._profiler = Profiler(profile_dir, top=profile_top)
+        self._data_cache = DataCache(data_cache_size)
+        self._verifier = (
+            PropagationVerifier(**verify_propagation) if verify_propagation is not None else None
+        )
+        self.propagation_reports = {}
+        self.incremental_populate = incremental_populate
+        self._record_groups = {}
+        self.populate_stats = {"reused": 0, "rebuilt": 0}
+        self.trusted_populate = trusted_populate
+        self.trusted_validation_sample = trusted_validation_sample
+        self._bootstrap = bootstrap
+
+        self._reads = HedgedCaller(
+            call_deadline=list_deadline,
+            run_deadline=run_deadline,
+            hedge_percentile=hedge_percentile,
+            hedge_min_samples=hedge_min_samples,
+        )
 
         self._zones = None
-        self._zone_records = {}
+        self._zone_records = ZoneRecordCache(
+            max_zones=zone_cache_max_zones,
+            max_records=zone_cache_max_records,
+            on_evict=self._zone_evicted,
+        )
 
     @property
     def zones(self):
         if self._zones is None:
-            dns_domains_list = self._client.list_dns_domains()
+            dns_domains_list = self._reads.call("list_dns_domains", self._client.list_dns_domains)
             self._zones = IdnaDict(
                 {f'{z["unicode-name"]}.': {"id": z["id"]} for z in dns_domains_list["dns-domains"]}
             )
         return self._zones
 
+    def start_run(self):
+        """Restart the ``run_deadline`` clock.
+
+        The deadline counts from the provider's creation, which is the start
+        of the run for ``octodns-sync``. Long-lived processes reusing the
+        provider call this at the start of every run.
+        """
+        self._reads.start_run()
+
     def _get_fqdn(self, name: str) -> str:
         return name if name.endswith(".") else f"{name}."
 
     def _get_record_name(self, record_name: str) -> str:
         return record_name if record_name else "."
 
+    def _canonical_content(self, _type: str, content: str) -> str:
+        if _type in ("CNAME", "MX", "NS"):
+            return content.rstrip(".").lower()
+        if _type == "TXT":
+            return content.replace("\\;", ";")
+        if _type == "CAA":
+            flags, tag, value = content.split(" ", 2)
+            value = value.replace('"', "")
+            return f"{int(flags)} {tag.lower()} {value}"
+        if _type == "SRV":
+            weight, port, target = content.split(" ", 2)
+            return f"{int(weight)} {int(port)} {target.rstrip('.').lower()}"
+        if _type == "NAPTR":
+            order, preference, flags, service, regexp, replacement = content.split(" ", 5)
+            return " ".join(
+                (
+                    str(int(order)),
+                    str(int(preference)),
+                    flags.replace('"', "").lower(),
+                    service.replace('"', ""),
+                    regexp.replace('"', ""),
+                    replacement.rstrip(".").lower(),
+                )
+            )
+        if _type == "SSHFP":
+            return content.lower()
+        return content
+
+    def _canonical_params(self, param: dict[str, Any]) -> tuple:
+        """Reduce an API record or a ``_params_for_*`` item to a comparable tuple.
+
+        Both sides go through the same normalization so that differences which
+        Exoscale does not preserve (apex spelling, trailing dots, quoting,
+        ``;`` escaping, hex case) never show up as changes.
+        """
+        return (
+            self._get_record_name(param["name"]),
+            param["type"],
+            param["ttl"],
+            param.get("priority"),
+            self._canonical_content(param["type"], param["content"]),
+        )
+
+    def _canonical_record(self, record: Record) -> Counter:
+        params_for = getattr(self, f"_params_for_{record._type}")
+        return Counter(self._canonical_params(param) for param in params_for(record))
+
+    def check_round_trip(self, zone: Zone) -> list[dict[str, Any]]:
+        """Report remote records that would not survive a populate/apply round trip.
+
+        Every (name, type) group of ``zone`` is converted with ``_data_for_*``,
+        turned into a ``Record`` and fed back through ``_params_for_*``. Groups
+        whose canonical form differs from what Exoscale returned would be
+        re-applied on every run and are returned with both sides for inspection.
+        """
+        self.log.debug("check_round_trip: name=%s", zone.name)
+
+        groups = defaultdict(list)
+        for record in self.zone_records(zone):
+            if record["type"] in self.SUPPORTS:
+                groups[(record["name"], record["type"])].append(record)
+
+        churn = []
+        for (name, _type), records in groups.items():
+            data = self._data_for(_type, records)
+            record = Record.new(zone, "" if name == "." else name, data, source=self, lenient=True)
+            remote = Counter(self._canonical_params(r) for r in records)
+            round_trip = self._canonical_record(record)
+            if remote != round_trip:
+                churn.append(
+                    {
+                        "name": name,
+                        "type": _type,
+                        "remote": sorted(remote.elements(), key=str),
+                        "round_trip": sorted(round_trip.elements(), key=str),
+                    }
+                )
+
+        self.log.info("check_round_trip:   %d of %d groups churn", len(churn), len(groups))
+
+        return churn
+
+    def _include_change(self, change: Change) -> bool:
+        if isinstance(change, Update):
+            if self._canonical_record(change.existing) == self._canonical_record(change.new):
+                self.log.debug("_include_change: ignoring canonical no-op %s", change)
+                return False
+        return True
+
     def populate(self, zone: Zone, target: bool = False, lenient: bool = False) -> bool:
         self.log.debug(
             "populate: name=%s, target=%s, lenient=%s",
@@ -73,50 +250,141 @@ class ExoscaleProvider(BaseProvider):
             lenient,
         )
 
-        values = defaultdict(lambda: defaultdict(list))
-
-        for record in self.zone_records(zone):
-            _type = record["type"]
-            _name = record["name"]
-
-            if _type not in self.SUPPORTS:
-                self.log.warning(f"populate: skipping unsupported {_type} {_name}.{zone} record")
-                continue
-            values[_name][_type].append(record)
-
-        before = len(zone.records)
-        for name, types in values.items():
-            for _type, records in types.items():
-                data_for = getattr(self, f"_data_for_{_type}")
-
-                if name == ".":
-                    name = ""
-
-                record = Record.new(
-                    zone,
-                    name,
-                    data_for(_type, records),
-                    source=self,
-                    lenient=lenient,
-                )
-                zone.add_record(record, lenient=lenient)
+        with self._profiler.phase(zone.name, "populate"):
+            values = defaultdict(lambda: defaultdict(list))
+
+            for record in self.zone_records(zone):
+                _type = record["type"]
+                _name = record["name"]
+
+                if _type not in self.SUPPORTS:
+                    self.log.warning(
+                        f"populate: skipping unsupported {_type} {_name}.{zone} record"
+                    )
+                    continue
+                values[_name][_type].append(record)
+
+            before = len(zone.records)
+            previous = self._record_groups.get(zone.name, {})
+            groups = {}
+            for name, types in values.items():
+                for _type, records in types.items():
+                    if name == ".":
+                        name = ""
+
+                    signature = self.incremental_populate and self._group_signature(records)
+                    cached = previous.get((name, _type))
+                    # records built leniently may not pass a strict populate
+                    if cached is not None and cached[0] == signature and (lenient or not cached[1]):
+                        _, built_lenient, record = cached
+                        # a shallow copy shares the parsed values without
+                        # keeping the zone it was built for (and that zone's
+                        # other records) alive
+                        record = copy(record)
+                        record.zone = zone
+                        self.populate_stats["reused"] += 1
+                    else:
+                        built_lenient = lenient
+                        record = self._new_record(
+                            zone, name, self._data_for(_type, records), lenient
+                        )
+                        self.populate_stats["rebuilt"] += 1
+                    zone.add_record(record, lenient=lenient)
+                    groups[(name, _type)] = (signature, built_lenient, record)
+
+            if self.incremental_populate:
+                self._record_groups[zone.name] = groups
+
+            exists = zone.name in self.zones
+            self.log.info(
+                "populate:   found %s records, exists=%s",
+                len(zone.records) - before,
+                exists,
+            )
+            self.log.debug(
+                "populate:   data cache %s, record groups %s",
+                self._data_cache.info(),
+                self.populate_stats,
+            )
 
-        exists = zone.name in self._zone_records
-        self.log.info(
-            "populate:   found %s records, exists=%s",
-            len(zone.records) - before,
-            exists,
+            return exists
+
+    def _new_record(self, zone: Zone, name: str, data: dict[str, Any], lenient: bool) -> Record:
+        if self.trusted_populate:
+            # Exoscale already accepted this content, only validate a sample.
+            # Picked by hashing the node so the choice is stable across runs
+            # and threads.
+            key = f"{zone.name}{name}{data['type']}".encode()
+            if zlib.crc32(key) >= self.trusted_validation_sample * 2**32:
+                return Record.registered_types()[data["type"]](zone, name, data, source=self)
+
+        return Record.new(zone, name, data, source=self, lenient=lenient)
+
+    def _group_signature(self, records: list[dict[str, Any]]) -> frozenset:
+        return frozenset(
+            (
+                record.get("id"),
+                record.get("updated-at"),
+                record["content"],
+                record["ttl"],
+                record.get("priority"),
+            )
+            for record in records
         )
 
-        return exists
-
     def zone_records(self, zone: Zone) -> list[dict[str, Any]]:
-        if zone.name not in self._zone_records:
-            self._zone_records[zone.name] = self._client.list_dns_domain_records(
-                domain_id=self.zones[zone.name]["id"]
-            )["dns-domain-records"]
-
-        return self._zone_records[zone.name]
+        records = self._zone_records.get(zone.name)
+        if records is None and zone.name not in self.zones:
+            # the domain doesn't exist (yet), nothing to fetch
+            return []
+        if records is None:
+            with self._profiler.phase(zone.name, "zone_records"):
+                records = self._reads.call(
+                    f"list_dns_domain_records[{zone.name}]",
+                    self._client.list_dns_domain_records,
+                    domain_id=self.zones[zone.name]["id"],
+                )["dns-domain-records"]
+            self._zone_records[zone.name] = records
+
+        return records
+
+    def _ensure_domain(self, zone: Zone) -> str:
+        if zone.name not in self.zones:
+            self.log.info("_ensure_domain: creating %s", zone.decoded_name)
+            operation = self._client.create_dns_domain(unicode_name=zone.decoded_name[:-1])
+            if operation.get("state") == "pending":
+                operation = self._client.wait(operation["id"])
+            # a relisting right away doesn't necessarily show the new domain
+            self.zones[zone.name] = {"id": operation["reference"]["id"]}
+        return self.zones[zone.name]["id"]
+
+    def _zone_evicted(self, zone_name: str):
+        self.log.debug("_zone_evicted: zone=%s, %s", zone_name, self._zone_records.info())
+        # the parsed records are what takes the memory, they go with the raw ones
+        self._record_groups.pop(zone_name, None)
+
+    def plan(self, desired: Zone, *args, **kwargs) -> Optional[Plan]:
+        plan = super().plan(desired, *args, **kwargs)
+        if plan is not None:
+            # _apply_delete needs the zone's records, keep them around if we can
+            self._zone_records.pin(desired.name)
+        return plan
+
+    def _data_for(self, _type: str, records: list[dict[str, Any]]) -> dict[str, Any]:
+        key = (
+            _type,
+            tuple((record["content"], record.get("priority")) for record in records),
+            records[0]["ttl"],
+        )
+        try:
+            return self._data_cache.get(
+                key, lambda: getattr(self, f"_data_for_{_type}")(_type, records)
+            )
+        except (ValueError, IndexError, KeyError) as e:
+            raise ProviderException(
+                f"malformed {_type} {records[0]['name']} content "
+                f"{[record['content'] for record in records]}: {e}"
+            ) from e
 
     def _data_for_multiple(self, _type: str, records: list[dict[str, Any]]) -> dict[str, Any]:
         return {
@@ -248,7 +516,8 @@ class ExoscaleProvider(BaseProvider):
         for value in record.values:
             yield {
                 "name": self._get_record_name(record.name),
-                "content": f"{value.preference} {value.exchange}",
+                "priority": value.preference,
+                "content": value.exchange,
                 "ttl": record.ttl,
                 "type": record._type,
             }
@@ -306,9 +575,9 @@ class ExoscaleProvider(BaseProvider):
         existing = changes.existing
         zone = existing.zone
 
+        name = self._get_record_name(existing.name)
         for record in self.zone_records(zone):
-            name = existing.name
-            if name == record["name"] and existing._type == record["type"]:
+            if name == self._get_record_name(record["name"]) and existing._type == record["type"]:
                 self._client.delete_dns_domain_record(
                     domain_id=self.zones[existing.zone.name]["id"],
                     record_id=record["id"],
@@ -318,14 +587,115 @@ class ExoscaleProvider(BaseProvider):
         self._apply_delete(changes)
         self._apply_create(changes)
 
+    def _bootstrapper(self) -> Bootstrapper:
+        return Bootstrapper(self, **(self._bootstrap or {}))
+
+    def _bootstrappable(self, plan: Plan) -> bool:
+        if self._bootstrap is None or not plan.changes:
+            return False
+        if self._bootstrapper().resumable(plan.desired):
+            # finish an interrupted import as long as that only adds records,
+            # the partially created ones show up as additive Updates
+            return all(
+                isinstance(change, Create)
+                or (
+                    isinstance(change, Update)
+                    and not self._canonical_record(change.existing)
+                    - self._canonical_record(change.new)
+                )
+                for change in plan.changes
+            )
+        if not all(isinstance(change, Create) for change in plan.changes):
+            return False
+        # Exoscale adds its own SOA and NS records to new domains
+        return all(record.get("system-record") for record in self.zone_records(plan.desired))
+
+    def bootstrap(self, zone: Zone, records: Optional[Iterable[Record]] = None) -> dict[str, Any]:
+        """Import the records of ``zone`` into an empty or missing domain.
+
+        Uses the ``bootstrap`` provider config (``workers``, ``queue_size``,
+        ``checkpoint_dir``) and returns created/skipped counts and duration.
+        """
+        self.log.info("bootstrap: zone=%s", zone.name)
+        return self._bootstrapper().run(zone, records)
+
     def _apply(self, plan: Plan):
         desired = plan.desired
         changes = plan.changes
         self.log.debug("_apply: zone=%s, len(changes)=%d", desired.name, len(changes))
 
-        for change in changes:
-            class_name = change.__class__.__name__.lower()
-            self.log.info(change)
-            getattr(self, f"_apply_{class_name}")(change)
+        if self._bootstrappable(plan):
+            self.bootstrap(desired, (change.new for change in changes))
+            self._zone_applied(plan)
+            return
+
+        self._ensure_domain(desired)
+
+        self._zone_records.pin(desired.name, hard=True)
+        try:
+            with self._profiler.phase(desired.name, "apply"):
+                for change in changes:
+                    self._apply_change(change)
+        finally:
+            self._zone_records.unpin(desired.name)
+
+        if self._bootstrap is not None:
+            # the zone now matches desired, a leftover import checkpoint would
+            # only make a later bootstrap skip records
+            self._bootstrapper().discard(desired)
+
+        self._zone_applied(plan)
+
+    def _nameservers(self, plan: Plan) -> list[str]:
+        root_ns = plan.existing.root_ns if plan.existing else None
+        if root_ns is None:
+            root_ns = plan.desired.root_ns
+        if root_ns is not None:
+            return list(root_ns.values)
+
+        return [
+            record["content"]
+            for record in self._zone_records.get(plan.desired.name, [])
+            if record["type"] == "NS" and self._get_record_name(record["name"]) == "."
+        ]
+
+    def _zone_applied(self, plan: Plan):
+        nameservers = None
+        if self._verifier is not None and plan.changes:
+            nameservers = self._nameservers(plan)
+
+        # release the records before verifying, that can take a while and
+        # raises in strict mode
+        self._zone_records.pop(plan.desired.name, None)
+
+        if nameservers is not None:
+            self.propagation_reports[plan.desired.name] = self._verifier.verify(plan, nameservers)
+
+    def _apply_change(self, change: Change):
+        class_name = change.__class__.__name__.lower()
+        self.log.info(change)
+        getattr(self, f"_apply_{class_name}")(change)
+
+    def apply_plans(self, plans: list[Plan]) -> dict[str, dict[str, Any]]:
+        """Apply many zone plans at once through the cross-zone scheduler.
+
+        Zones share ``apply_workers`` workers and are interleaved by their
+        ``zone_priorities`` (higher first, round-robin within a priority). The
+        returned report holds per-zone change counts and completion times.
+
+        This is library API, ``octodns-sync`` applies zones one at a time
+        through ``apply`` and never calls it.
+        """
+        if self.apply_disabled:
+            self.log.info("apply_plans: disabled")
+            return {}
 
-        self._zone_records.pop(desired.name, None)
+        self.log.info(
+            "apply_plans: making %d changes to %d zones",
+            sum(len(plan.changes) for plan in plans),
+            len(plans),
+        )
+        scheduler = ApplyScheduler(
+            self, max_workers=self.apply_workers, priorities=self.zone_priorities
+        )
+        return scheduler.run(plans)
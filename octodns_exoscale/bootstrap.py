@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+from octodns.record import Record
+from octodns.zone import Zone
+
+_DONE = object()
+
+
+class Bootstrapper:
+    """Import all records of a zone into an empty or missing Exoscale domain.
+
+    The ``_params_for_*`` output of every record is streamed through a queue
+    of at most ``queue_size`` items to ``workers`` threads creating the
+    records, so the full operation list never exists in memory. With a
+    ``checkpoint_dir`` every created record is appended to
+    ``<zone>bootstrap.jsonl`` there, a later run against the same domain id
+    skips those and the file is removed once the import completes. Records
+    that already exist remotely are always skipped.
+    """
+
+    def __init__(
+        self,
+        provider,
+        workers: int = 4,
+        queue_size: int = 256,
+        checkpoint_dir: Optional[str] = None,
+    ):
+        self.log = logging.getLogger(f"Bootstrapper[{provider.id}]")
+        self.provider = provider
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.checkpoint_dir = checkpoint_dir
+
+    def _key(self, param: dict[str, Any]) -> str:
+        return json.dumps(self.provider._canonical_params(param))
+
+    def _checkpoint(self, zone: Zone) -> Optional[str]:
+        if self.checkpoint_dir is None:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{zone.name}bootstrap.jsonl")
+
+    def resumable(self, zone: Zone) -> bool:
+        """Whether an interrupted import of ``zone`` left a checkpoint behind."""
+        path = self._checkpoint(zone)
+        return path is not None and os.path.exists(path)
+
+    def discard(self, zone: Zone):
+        path = self._checkpoint(zone)
+        if path and os.path.exists(path):
+            self.log.info("discard: zone=%s, removing checkpoint %s", zone.name, path)
+            os.remove(path)
+
+    def _load(self, zone: Zone, path: str, domain_id: str) -> set:
+        with open(path, encoding="utf-8") as fh:
+            lines = [line.rstrip("\n") for line in fh if line.strip()]
+        if not lines or json.loads(lines[0]).get("domain_id") != domain_id:
+            # left behind by an import into a domain that has since been
+            # deleted/recreated, none of its records exist anymore
+            self.log.warning("run: zone=%s, ignoring stale checkpoint %s", zone.name, path)
+            os.remove(path)
+            return set()
+        return set(lines[1:])
+
+    def _params(
+        self, records: Iterable[Record], done: set, stats: dict[str, Any]
+    ) -> Iterator[dict[str, Any]]:
+        for record in records:
+            params_for = getattr(self.provider, f"_params_for_{record._type}")
+            for param in params_for(record):
+                if self._key(param) in done:
+                    stats["skipped"] += 1
+                    continue
+                yield param
+
+    def run(self, zone: Zone, records: Optional[Iterable[Record]] = None) -> dict[str, Any]:
+        """Create ``records`` (all of ``zone``'s by default) in ``zone``'s domain."""
+        start = time.monotonic()
+        domain_id = self.provider._ensure_domain(zone)
+
+        path = self._checkpoint(zone)
+        done = set()
+        if path and os.path.exists(path):
+            done = self._load(zone, path, domain_id)
+            self.log.info("run: zone=%s resuming after %d records", zone.name, len(done))
+        # covers a record created right before an interruption, but not yet
+        # checkpointed
+        done.update(self._key(record) for record in self.provider.zone_records(zone))
+
+        checkpoint = None
+        if path:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            new = not os.path.exists(path)
+            checkpoint = open(path, "a", encoding="utf-8")
+            if new:
+                checkpoint.write(f"{json.dumps({'domain_id': domain_id})}\n")
+                checkpoint.flush()
+
+        work = queue.Queue(maxsize=self.queue_size)
+        lock = threading.Lock()
+        failed = threading.Event()
+        errors = []
+        stats = {"created": 0, "skipped": 0}
+
+        def worker():
+            while True:
+                param = work.get()
+                if param is _DONE:
+                    return
+                if failed.is_set():
+                    continue
+                kwargs = {
+                    "domain_id": domain_id,
+                    "name": "" if param["name"] == "." else param["name"],
+                    "type": param["type"],
+                    "content": param["content"],
+                    "ttl": param["ttl"],
+                }
+                if "priority" in param:
+                    kwargs["priority"] = param["priority"]
+                try:
+                    self.provider._client.create_dns_domain_record(**kwargs)
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    failed.set()
+                    continue
+                with lock:
+                    stats["created"] += 1
+                    if checkpoint:
+                        checkpoint.write(f"{self._key(param)}\n")
+                        checkpoint.flush()
+
+        threads = [
+            threading.Thread(target=worker, name=f"bootstrap-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for param in self._params(zone.records if records is None else records, done, stats):
+                if failed.is_set():
+                    break
+                work.put(param)
+        finally:
+            for _ in threads:
+                work.put(_DONE)
+            for thread in threads:
+                thread.join()
+            if checkpoint:
+                checkpoint.close()
+
+        stats["seconds"] = time.monotonic() - start
+        self.log.info("run: zone=%s %s", zone.name, stats)
+
+        if errors:
+            self.log.error(
+                "run: zone=%s stopped after %d records, %d failed",
+                zone.name,
+                stats["created"],
+                len(errors),
+            )
+            raise errors[0]
+
+        if path:
+            os.remove(path)
+
+        return stats
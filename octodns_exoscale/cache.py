@@ -0,0 +1,162 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class DataCache:
+    """Bounded LRU memo of ``_data_for_*`` results.
+
+    Zones generated from the same template share many identical record sets,
+    keying on (type, contents, ttl) lets those be parsed once per process.
+    A ``maxsize`` of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        if not self.maxsize:
+            return build()
+
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                # callers get their own top level dict, the nested values are
+                # only read by Record.new
+                return dict(data)
+            self.misses += 1
+
+        data = build()
+        with self._lock:
+            self._data[key] = data
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return dict(data)
+
+    def info(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_MISSING = object()
+
+
+class ZoneRecordCache:
+    """LRU cache of the raw Exoscale records of each zone.
+
+    Bounded by number of zones and/or total records, 0 meaning unlimited.
+    Hard pinned zones (an ``_apply`` in progress) are never evicted, soft
+    pinned ones (a plan waiting to be applied) only once no unpinned zone is
+    left to evict. The most recently stored zone is never evicted, it's the one
+    being worked on. ``on_evict`` is called with the name of every evicted zone.
+    """
+
+    def __init__(
+        self,
+        max_zones: int = 0,
+        max_records: int = 0,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self.max_zones = max_zones
+        self.max_records = max_records
+        self.on_evict = on_evict
+        self.evictions = 0
+        self.refetches = 0
+        self._data = OrderedDict()
+        self._records = 0
+        self._pinned = {}
+        self._evicted = set()
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, name: str) -> list[dict[str, Any]]:
+        with self._lock:
+            records = self._data[name]
+            self._data.move_to_end(name)
+            return records
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __setitem__(self, name: str, records: list[dict[str, Any]]):
+        with self._lock:
+            if name in self._evicted:
+                self._evicted.discard(name)
+                self.refetches += 1
+            self._records -= len(self._data.pop(name, ()))
+            self._data[name] = records
+            self._records += len(records)
+            evicted = self._evict()
+
+        for name in evicted:
+            if self.on_evict is not None:
+                self.on_evict(name)
+
+    def pop(self, name: str, default: Any = _MISSING) -> Any:
+        with self._lock:
+            self._pinned.pop(name, None)
+            if name not in self._data:
+                if default is _MISSING:
+                    raise KeyError(name)
+                return default
+            records = self._data.pop(name)
+            self._records -= len(records)
+            return records
+
+    def pin(self, name: str, hard: bool = False):
+        with self._lock:
+            self._pinned[name] = hard or self._pinned.get(name, False)
+
+    def unpin(self, name: str):
+        with self._lock:
+            self._pinned.pop(name, None)
+
+    def _over(self) -> bool:
+        return (self.max_zones and len(self._data) > self.max_zones) or (
+            self.max_records and self._records > self.max_records
+        )
+
+    def _evict(self) -> list[str]:
+        evicted = []
+        newest = next(reversed(self._data))
+        for allow_soft in (False, True):
+            for name in list(self._data):
+                if not self._over():
+                    return evicted
+                pinned = self._pinned.get(name)
+                if name == newest or pinned or (pinned is not None and not allow_soft):
+                    continue
+                self._records -= len(self._data.pop(name))
+                self._evicted.add(name)
+                self.evictions += 1
+                evicted.append(name)
+        return evicted
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "zones": len(self._data),
+            "records": self._records,
+            "pinned": len(self._pinned),
+            "evictions": self.evictions,
+            "refetches": self.refetches,
+        }
@@ -0,0 +1,127 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Iterable
+
+from octodns.provider import ProviderException
+
+# A cassette is a JSON lines file, one API interaction per line:
+#
+#   {"method": "list_dns_domain_records", "kwargs": {"domain_id": "..."},
+#    "response": {...}, "duration": 0.123}
+#
+# Failed calls store ``"error": {"type": "...", "message": "..."}`` instead of
+# a response.
+
+SCRUBBED = "***scrubbed***"
+
+
+class CassetteException(ProviderException):
+    pass
+
+
+def _key(method: str, kwargs: dict[str, Any]) -> tuple[str, str]:
+    return method, json.dumps(kwargs, sort_keys=True)
+
+
+class RecordingClient:
+    """Proxy for the Exoscale client that appends every call to a cassette.
+
+    Any of the ``scrub`` strings (the API credentials by default) found in an
+    interaction is replaced before the line is written.
+    """
+
+    def __init__(self, client, path: str, scrub: Iterable[str] = ()):
+        self.log = logging.getLogger("RecordingClient")
+        self.log.info("__init__: path=%s", path)
+        self._client = client
+        self._scrub = [s for s in scrub if s]
+        self._lock = threading.Lock()
+        self._fh = open(path, "a", encoding="utf-8")
+        self.calls = Counter()
+        self.seconds = 0.0
+
+    def _write(self, interaction: dict[str, Any]):
+        line = json.dumps(interaction, sort_keys=True)
+        for secret in self._scrub:
+            line = line.replace(secret, SCRUBBED)
+        with self._lock:
+            self.calls[interaction["method"]] += 1
+            self.seconds += interaction["duration"]
+            self._fh.write(f"{line}\n")
+            self._fh.flush()
+
+    def __getattr__(self, method: str):
+        func = getattr(self._client, method)
+        if not callable(func):
+            return func
+
+        def call(**kwargs):
+            interaction = {"method": method, "kwargs": kwargs}
+            start = time.perf_counter()
+            try:
+                interaction["response"] = response = func(**kwargs)
+                return response
+            except Exception as e:
+                interaction["error"] = {"type": e.__class__.__name__, "message": str(e)}
+                raise
+            finally:
+                interaction["duration"] = time.perf_counter() - start
+                self._write(interaction)
+
+        return call
+
+    def close(self):
+        self._fh.close()
+
+
+class ReplayClient:
+    """Serve the interactions of a cassette instead of talking to Exoscale.
+
+    Calls are matched on method and keyword arguments and answered in the
+    recorded order; once a call's recordings are used up the last one is
+    repeated. ``latency`` scales the recorded durations that are slept before
+    answering, 0 answers immediately and 1 replays the recorded timing.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.log = logging.getLogger("ReplayClient")
+        self.log.info("__init__: path=%s, latency=%s", path, latency)
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(deque)
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    interaction = json.loads(line)
+                    key = _key(interaction["method"], interaction["kwargs"])
+                    self._interactions[key].append(interaction)
+        self.calls = Counter()
+        self.seconds = 0.0
+
+    def _next(self, method: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            interactions = self._interactions.get(_key(method, kwargs))
+            if not interactions:
+                raise CassetteException(f"no recorded interaction for {method}({kwargs})")
+            interaction = interactions.popleft() if len(interactions) > 1 else interactions[0]
+            self.calls[method] += 1
+            self.seconds += interaction["duration"]
+        return interaction
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(**kwargs):
+            interaction = self._next(method, kwargs)
+            if self.latency:
+                time.sleep(interaction["duration"] * self.latency)
+            if "error" in interaction:
+                error = interaction["error"]
+                raise CassetteException(f"{error['type']}: {error['message']}")
+            return interaction["response"]
+
+        return call
@@ -0,0 +1,176 @@
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Optional
+
+import requests
+from octodns.provider import ProviderException
+
+
+class DeadlineExceeded(ProviderException):
+    pass
+
+
+class RunDeadlineExceeded(DeadlineExceeded):
+    pass
+
+
+class TimeoutSession(requests.Session):
+    """``requests.Session`` applying ``timeout`` to every request without one."""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class LatencyTracker:
+    """Sliding window of observed call latencies."""
+
+    def __init__(self, window: int = 256):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(p / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+class HedgedCaller:
+    """Run idempotent reads with deadlines and optional hedging.
+
+    ``call_deadline`` bounds each call, ``run_deadline`` bounds everything
+    since the caller was created or ``start_run`` was last called, after
+    which calls fail immediately with ``RunDeadlineExceeded``. With
+    ``hedge_percentile`` set a second copy of a call is sent once the first
+    has been outstanding longer than that percentile of the latencies observed
+    for the same call ``name`` (after ``hedge_min_samples`` observations) and
+    whichever answers first wins. Names include the zone for record listings,
+    so a large zone is compared with its own history, not with small ones. Every copy runs on its own daemon thread, calls that are given up on
+    keep running in the background until the HTTP timeout ends them, their
+    results are discarded.
+
+    Without any of the three options calls are made directly.
+    """
+
+    def __init__(
+        self,
+        call_deadline: Optional[float] = None,
+        run_deadline: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 10,
+    ):
+        self.log = logging.getLogger("HedgedCaller")
+        self.call_deadline = call_deadline
+        self.run_deadline = run_deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = defaultdict(LatencyTracker)
+        self.stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "deadlines": 0}
+        self._lock = threading.Lock()
+        self.start_run()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.call_deadline or self.run_deadline or self.hedge_percentile)
+
+    def start_run(self):
+        """Restart the ``run_deadline`` clock."""
+        self._run_start = time.monotonic()
+
+    def _latencies(self, name: str) -> LatencyTracker:
+        with self._lock:
+            return self.latencies[name]
+
+    def _submit(self, name: str, func: Callable, kwargs: dict[str, Any]) -> Future:
+        latencies = self._latencies(name)
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def timed():
+            start = time.monotonic()
+            try:
+                result = func(**kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            latencies.add(time.monotonic() - start)
+            future.set_result(result)
+
+        # daemon threads, an abandoned call must not keep the process alive
+        # or hold a slot new calls would have to wait for
+        threading.Thread(target=timed, name="hedged", daemon=True).start()
+        return future
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _timeout(self, name: str) -> Optional[float]:
+        timeout = self.call_deadline
+        if self.run_deadline:
+            remaining = self.run_deadline - (time.monotonic() - self._run_start)
+            if remaining <= 0:
+                self._count("deadlines")
+                raise RunDeadlineExceeded(
+                    f"{name}: run deadline of {self.run_deadline}s exceeded, not starting call"
+                )
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def call(self, name: str, func: Callable, **kwargs) -> Any:
+        timeout = self._timeout(name)
+        self._count("calls")
+        if not self.enabled:
+            return func(**kwargs)
+
+        start = time.monotonic()
+        futures = [self._submit(name, func, kwargs)]
+
+        threshold = None
+        latencies = self._latencies(name)
+        if self.hedge_percentile and len(latencies) >= self.hedge_min_samples:
+            threshold = latencies.percentile(self.hedge_percentile)
+        if threshold is not None and (timeout is None or threshold < timeout):
+            done, _ = wait(futures, timeout=threshold)
+            if not done:
+                self.log.debug("call: %s hedged after %.3fs", name, threshold)
+                self._count("hedges")
+                futures.append(self._submit(name, func, kwargs))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            remaining = None if timeout is None else timeout - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+
+        self._count("deadlines")
+        raise DeadlineExceeded(f"{name}: no answer within {timeout:.3f}s")
@@ -0,0 +1,106 @@
+import cProfile
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Optional
+
+PROFILE_DIR_ENV = "OCTODNS_EXOSCALE_PROFILE_DIR"
+
+_DISABLED = nullcontext()
+
+# cProfile allows a single active profile per process (enforced from Python
+# 3.12 on), so this is shared by every Profiler
+_ACTIVE = threading.Lock()
+_counts = defaultdict(int)
+
+
+class _Phase:
+    def __init__(self, profiler: "Profiler", basename: str):
+        self.profiler = profiler
+        self.basename = basename
+
+    def __enter__(self):
+        self.profile = None
+        self.started_tracing = not tracemalloc.is_tracing()
+        try:
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.before = tracemalloc.take_snapshot()
+            self.start = time.perf_counter()
+            profile = cProfile.Profile()
+            profile.enable()
+        except Exception as e:
+            # e.g. another profiling tool is active, skip rather than failing
+            # the phase itself
+            self._release()
+            self.profiler.log.debug("phase: skipping %s, %s", self.basename, e)
+            return self
+        self.profile = profile
+        return self
+
+    def _release(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+        _ACTIVE.release()
+
+    def __exit__(self, *exc):
+        if self.profile is None:
+            return False
+        self.profile.disable()
+        elapsed = time.perf_counter() - self.start
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        self._release()
+
+        path = os.path.join(self.profiler.directory, self.basename)
+        self.profile.dump_stats(f"{path}.prof")
+
+        stats = after.compare_to(self.before, "lineno")[: self.profiler.top]
+        with open(f"{path}.alloc.txt", "w") as fh:
+            fh.write(f"elapsed: {elapsed:.6f}s\npeak: {peak} bytes\n\n")
+            for stat in stats:
+                fh.write(f"{stat}\n")
+
+        self.profiler.log.info("profiled %s in %.3fs, peak=%d bytes", path, elapsed, peak)
+        return False
+
+
+class Profiler:
+    """Opt-in cProfile and tracemalloc capture of provider phases.
+
+    Every ``phase`` writes ``<zone><phase>.<n>.prof`` (loadable with ``pstats``)
+    and ``<zone><phase>.<n>.alloc.txt`` with the top allocation sites to
+    ``directory``. Without a directory ``phase`` hands back a shared no-op
+    context manager. Only one phase can be profiled per process at a time,
+    across all profilers, so phases that start while another one is running
+    (nested, or populated from another thread or provider) are folded into it
+    and skipped with a debug log.
+    """
+
+    def __init__(self, directory: Optional[str] = None, top: int = 25):
+        self.log = logging.getLogger("ExoscaleProfiler")
+        self.directory = directory or os.environ.get(PROFILE_DIR_ENV) or None
+        self.top = top
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def phase(self, zone_name: str, phase: str):
+        if self.directory is None:
+            return _DISABLED
+        if not _ACTIVE.acquire(blocking=False):
+            self.log.debug("phase: skipping %s%s, another phase is profiled", zone_name, phase)
+            return _DISABLED
+
+        key = f"{zone_name}{phase}"
+        _counts[(self.directory, key)] += 1
+        return _Phase(self, f"{key}.{_counts[(self.directory, key)]}")
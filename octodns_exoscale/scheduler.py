@@ -0,0 +1,171 @@
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Optional
+
+from octodns.provider import ProviderException
+from octodns.provider.base import Plan
+from octodns.record import Change, Create, Delete, Update
+
+# Within a node removals have to land before additions, e.g. an A record
+# being replaced by a CNAME of the same name.
+_CHANGE_ORDER = {Delete: 0, Update: 1, Create: 2}
+
+
+class ApplySchedulerException(ProviderException):
+    def __init__(self, msg: str, report: dict[str, dict[str, Any]]):
+        super().__init__(msg)
+        self.report = report
+
+
+class ApplyScheduler:
+    """Apply the changes of many zone plans through one shared worker pool.
+
+    Changes are grouped per node (zone, name) and a node is always handled by a
+    single worker, deletes first. Nodes are handed out round-robin across the
+    zones of the highest pending priority so that one large zone cannot hold
+    the whole API budget while the others wait.
+    """
+
+    def __init__(self, provider, max_workers: int = 1, priorities: Optional[dict] = None):
+        self.log = logging.getLogger(f"ApplyScheduler[{provider.id}]")
+        self.provider = provider
+        self.max_workers = max(1, max_workers)
+        self.priorities = priorities or {}
+
+    def _priority(self, zone_name: str) -> int:
+        return self.priorities.get(zone_name, self.priorities.get(zone_name.rstrip("."), 0))
+
+    def _nodes(self, plan: Plan) -> deque:
+        nodes = defaultdict(list)
+        for change in plan.changes:
+            nodes[change.record.name].append(change)
+
+        return deque(
+            sorted(changes, key=lambda c: _CHANGE_ORDER[c.__class__]) for changes in nodes.values()
+        )
+
+    def _run_node(self, changes: list[Change]):
+        for change in changes:
+            self.provider._apply_change(change)
+
+    def run(self, plans: list[Plan]) -> dict[str, dict[str, Any]]:
+        """Apply ``plans`` and return a report keyed by zone name.
+
+        Each report entry holds the number of ``changes``, the ``seconds`` from
+        the start of the run until the zone's last change completed, and the
+        ``error`` that stopped the zone, if any.
+        """
+        start = time.monotonic()
+
+        queues = {}
+        report = {}
+        zone_plans = {}
+        finished = set()
+        try:
+            for plan in plans:
+                zone_name = plan.desired.name
+                zone_plans[zone_name] = plan
+                self.provider._zone_records.pin(zone_name, hard=True)
+                queues[zone_name] = self._nodes(plan)
+                report[zone_name] = {"changes": len(plan.changes), "seconds": 0.0, "error": None}
+
+            # populate the lazy zones lookup once, before any worker needs it
+            for plan in plans:
+                self.provider._ensure_domain(plan.desired)
+
+            pending = {zone_name: len(nodes) for zone_name, nodes in queues.items()}
+            by_priority = defaultdict(deque)
+            for zone_name in queues:
+                by_priority[self._priority(zone_name)].append(zone_name)
+            levels = sorted(by_priority, reverse=True)
+
+            # post-apply work (propagation checks) can take a while, it runs on
+            # its own pool so the dispatcher keeps the workers busy meanwhile
+            verifier = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="verify")
+            verifying = {}
+
+            def finish(zone_name):
+                finished.add(zone_name)
+                report[zone_name]["seconds"] = time.monotonic() - start
+                if report[zone_name]["error"] is None:
+                    future = verifier.submit(self.provider._zone_applied, zone_plans[zone_name])
+                    verifying[future] = zone_name
+                else:
+                    self.provider._zone_records.pop(zone_name, None)
+                self.log.info(
+                    "run: zone=%s done in %.3fs, error=%s",
+                    zone_name,
+                    report[zone_name]["seconds"],
+                    report[zone_name]["error"],
+                )
+
+            with verifier:
+                for zone_name, count in pending.items():
+                    if not count:
+                        finish(zone_name)
+
+                def next_node():
+                    for level in levels:
+                        ring = by_priority[level]
+                        while ring:
+                            zone_name = ring.popleft()
+                            nodes = queues[zone_name]
+                            if report[zone_name]["error"] is not None:
+                                continue
+                            if nodes:
+                                node = nodes.popleft()
+                                if nodes:
+                                    ring.append(zone_name)
+                                return zone_name, node
+                    return None
+
+                in_flight = {}
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    while True:
+                        while len(in_flight) < self.max_workers:
+                            item = next_node()
+                            if item is None:
+                                break
+                            zone_name, node = item
+                            # fetch the records _apply_delete needs in this thread so
+                            # workers of the same zone don't race to list them
+                            if any(not isinstance(c, Create) for c in node):
+                                self.provider.zone_records(node[0].record.zone)
+                            in_flight[executor.submit(self._run_node, node)] = zone_name
+
+                        if not in_flight:
+                            break
+
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            zone_name = in_flight.pop(future)
+                            pending[zone_name] -= 1
+                            error = future.exception()
+                            if error is not None and report[zone_name]["error"] is None:
+                                self.log.error("run: zone=%s failed: %s", zone_name, error)
+                                report[zone_name]["error"] = error
+                                # drop the zone's remaining nodes, in-flight ones still finish
+                                pending[zone_name] -= len(queues[zone_name])
+                                queues[zone_name].clear()
+                            if pending[zone_name] == 0:
+                                finish(zone_name)
+        finally:
+            # don't leave zones pinned when the run is cut short, finished
+            # ones were released by finish/_zone_applied
+            for zone_name in zone_plans:
+                if zone_name not in finished:
+                    self.provider._zone_records.unpin(zone_name)
+
+        for future, zone_name in verifying.items():
+            error = future.exception()
+            if error is not None:
+                self.log.error("run: zone=%s verification failed: %s", zone_name, error)
+                report[zone_name]["error"] = error
+
+        failed = sorted(z for z, r in report.items() if r["error"] is not None)
+        if failed:
+            raise ApplySchedulerException(f"apply failed for zones: {', '.join(failed)}", report)
+
+        return report
@@ -0,0 +1,228 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from octodns.provider.yaml import YamlProvider
+from octodns.zone import Zone
+
+from . import ExoscaleProvider
+
+SNAPSHOT_VERSION = 1
+
+# A snapshot is a plain dict:
+#
+#   {"version": 1, "zones": {"<zone>.": {"<name>": {"<type>": <_data_for_* output>}}}}
+#
+# Apex records use the empty name, just like octoDNS. Values are stored in a
+# canonical order so two snapshots can be compared with ``==``.
+
+
+def _sort_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def _canonical_data(data: dict[str, Any]) -> dict[str, Any]:
+    if "values" in data:
+        data = dict(data, values=sorted(data["values"], key=_sort_key))
+    return data
+
+
+def _zone_data(
+    provider: ExoscaleProvider, records: Iterable[dict[str, Any]]
+) -> dict[str, dict[str, Any]]:
+    groups = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        if record["type"] not in provider.SUPPORTS:
+            continue
+        name = "" if record["name"] == "." else record["name"]
+        groups[name][record["type"]].append(record)
+
+    return {
+        name: {
+            _type: _canonical_data(provider._data_for(_type, records))
+            for _type, records in types.items()
+        }
+        for name, types in groups.items()
+    }
+
+
+def dump(provider: ExoscaleProvider, zone_names: Optional[list[str]] = None) -> dict[str, Any]:
+    """Fetch every (or the given) Exoscale zone and return it as a snapshot."""
+    zones = {}
+    for zone_name in sorted(zone_names or provider.zones.keys()):
+        zone = Zone(zone_name, [])
+        zones[zone_name] = _zone_data(provider, provider.zone_records(zone))
+        # the snapshot holds everything we need, don't keep the raw records
+        provider._zone_records.pop(zone_name, None)
+
+    return {"version": SNAPSHOT_VERSION, "zones": zones}
+
+
+def from_config(
+    provider: ExoscaleProvider, directory: str, zone_names: Optional[list[str]] = None
+) -> dict[str, Any]:
+    """Build a snapshot from an octoDNS YAML config directory.
+
+    Records are round tripped through ``_params_for_*`` and ``_data_for_*`` so
+    they end up in exactly the shape ``dump`` produces for the same content.
+    """
+    source = YamlProvider("config", directory, enforce_order=False, escaped_semicolons=True)
+
+    zones = {}
+    for zone_name in sorted(zone_names or source.list_zones()):
+        zone = Zone(zone_name, [])
+        source.populate(zone)
+        records = []
+        for record in zone.records:
+            if record._type not in provider.SUPPORTS:
+                provider.log.warning(
+                    "from_config: skipping unsupported %s %s", record._type, record.fqdn
+                )
+                continue
+            records.extend(getattr(provider, f"_params_for_{record._type}")(record))
+        zones[zone_name] = _zone_data(provider, records)
+
+    return {"version": SNAPSHOT_VERSION, "zones": zones}
+
+
+def diff(
+    old: dict[str, Any], new: dict[str, Any], zones: Optional[Iterable[str]] = None
+) -> list[tuple[str, str, str, str, Any, Any]]:
+    """Compare two snapshots at the record-value level.
+
+    Returns ``(op, zone, name, type, old, new)`` tuples where ``op`` is ``+``,
+    ``-`` or ``~``. Zones present in either snapshot are compared, a zone
+    missing from one side shows up as all its records added or removed.
+    ``zones`` limits the comparison to those zones.
+    """
+    if zones is None:
+        zones = set(old["zones"]) | set(new["zones"])
+
+    changes = []
+    for zone_name in sorted(set(zones)):
+        old_zone = old["zones"].get(zone_name, {})
+        new_zone = new["zones"].get(zone_name, {})
+        for name in sorted(set(old_zone) | set(new_zone)):
+            old_types = old_zone.get(name, {})
+            new_types = new_zone.get(name, {})
+            for _type in sorted(set(old_types) | set(new_types)):
+                before = old_types.get(_type)
+                after = new_types.get(_type)
+                if before == after:
+                    continue
+                op = "+" if before is None else "-" if after is None else "~"
+                changes.append((op, zone_name, name, _type, before, after))
+
+    return changes
+
+
+def check(provider: ExoscaleProvider, zone_names: Optional[list[str]] = None) -> int:
+    """Print the record groups of every (or the given) zone that don't survive
+    a populate/apply round trip, returns 1 if there are any, 0 otherwise."""
+    churned = 0
+    for zone_name in sorted(zone_names or provider.zones.keys()):
+        for churn in provider.check_round_trip(Zone(zone_name, [])):
+            churned += 1
+            name = churn["name"]
+            fqdn = zone_name if name in ("", ".") else f"{name}.{zone_name}"
+            print(
+                f"{fqdn} {churn['type']} {json.dumps(churn['remote'])} "
+                f"-> {json.dumps(churn['round_trip'])}"
+            )
+        provider._zone_records.pop(zone_name, None)
+
+    return 1 if churned else 0
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_snapshot(snapshot: dict[str, Any], path: str):
+    with _open(path, "w") as fh:
+        json.dump(snapshot, fh, separators=(",", ":"), sort_keys=True)
+
+
+def read_snapshot(path: str) -> dict[str, Any]:
+    with _open(path, "r") as fh:
+        snapshot = json.load(fh)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot version {snapshot.get('version')}")
+    return snapshot
+
+
+def _provider(args) -> ExoscaleProvider:
+    return ExoscaleProvider("snapshot", args.auth_key, args.auth_secret, args.auth_zone)
+
+
+def _fqdn(zone_names: Optional[list[str]]) -> Optional[list[str]]:
+    return [z if z.endswith(".") else f"{z}." for z in zone_names] if zone_names else None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="octodns-exoscale-snapshot",
+        description=(
+            "Dump Exoscale zones to a snapshot file, diff snapshots offline and check"
+            " zones for records that churn."
+        ),
+    )
+    parser.add_argument("--auth-key", default=os.environ.get("EXOSCALE_AUTH_KEY", ""))
+    parser.add_argument("--auth-secret", default=os.environ.get("EXOSCALE_AUTH_SECRET", ""))
+    parser.add_argument("--auth-zone", default=os.environ.get("EXOSCALE_AUTH_ZONE", "ch-gva-2"))
+    parser.add_argument("--zone", action="append", dest="zones", help="limit to this zone")
+    parser.add_argument("--debug", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = commands.add_parser("dump", help="fetch zones from Exoscale into a snapshot")
+    dump_parser.add_argument("output", help="snapshot file, gzipped if it ends in .gz")
+
+    commands.add_parser(
+        "check", help="report remote records that would churn on every octoDNS apply"
+    )
+
+    diff_parser = commands.add_parser("diff", help="diff a snapshot against another or a config")
+    diff_parser.add_argument("snapshot", help="snapshot of the current state")
+    target = diff_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--snapshot", dest="other", help="snapshot of the desired state")
+    target.add_argument("--config-dir", help="octoDNS YAML config directory")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+
+    provider = _provider(args)
+    zone_names = _fqdn(args.zones)
+
+    if args.command == "dump":
+        snapshot = dump(provider, zone_names)
+        write_snapshot(snapshot, args.output)
+        return 0
+
+    if args.command == "check":
+        return check(provider, zone_names)
+
+    current = read_snapshot(args.snapshot)
+    if args.other:
+        desired = read_snapshot(args.other)
+        changes = diff(current, desired, zone_names)
+    else:
+        # a config directory usually only manages some of the account's zones
+        desired = from_config(provider, args.config_dir, zone_names)
+        changes = diff(current, desired, desired["zones"])
+
+    for op, zone_name, name, _type, before, after in changes:
+        fqdn = f"{name}.{zone_name}" if name else zone_name
+        print(f"{op} {fqdn} {_type} {json.dumps(before)} -> {json.dumps(after)}")
+
+    return 1 if changes else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import ipaddress
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import dns.exception
+import dns.flags
+import dns.message
+import dns.query
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+from octodns.provider import ProviderException
+from octodns.provider.base import Plan
+from octodns.record import Delete, Record
+
+
+class PropagationException(ProviderException):
+    def __init__(self, msg: str, report: dict[str, Any]):
+        super().__init__(msg)
+        self.report = report
+
+
+def _rdatas(record: Record) -> set:
+    rdtype = dns.rdatatype.from_text(record._type)
+    if hasattr(record, "to_rrset"):
+        texts = record.to_rrset().rdatas
+    else:
+        texts = record.rrs[3]
+    return {dns.rdata.from_text(dns.rdataclass.IN, rdtype, text) for text in texts}
+
+
+class PropagationVerifier:
+    """Check that applied changes are served by the zone's nameservers.
+
+    Every changed (name, type) is queried on every nameserver concurrently,
+    bounded by ``max_workers``. A check is retried every ``interval`` seconds,
+    at most ``attempts`` times, until the answer matches the planned values
+    (or is empty for deletes). With ``strict`` a mismatch raises a
+    ``PropagationException``, otherwise it's logged.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[list[str]] = None,
+        port: int = 53,
+        timeout: float = 2.0,
+        attempts: int = 5,
+        interval: float = 2.0,
+        max_workers: int = 16,
+        strict: bool = False,
+    ):
+        self.log = logging.getLogger("PropagationVerifier")
+        self.nameservers = nameservers
+        self.port = port
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
+        self.interval = interval
+        self.max_workers = max_workers
+        self.strict = strict
+
+    def _addresses(self, nameservers: list[str]) -> list[str]:
+        addresses = []
+        for nameserver in nameservers:
+            try:
+                ipaddress.ip_address(nameserver)
+                addresses.append(nameserver)
+                continue
+            except ValueError:
+                pass
+            try:
+                infos = socket.getaddrinfo(nameserver, self.port, type=socket.SOCK_DGRAM)
+            except socket.gaierror as e:
+                self.log.warning("_addresses: unable to resolve %s: %s", nameserver, e)
+                continue
+            addresses.extend(sorted({info[4][0] for info in infos}))
+        return addresses
+
+    def _query(self, fqdn: str, _type: str, address: str) -> set:
+        query = dns.message.make_query(fqdn, _type)
+        response = dns.query.udp(query, address, timeout=self.timeout, port=self.port)
+        if response.flags & dns.flags.TC:
+            response = dns.query.tcp(query, address, timeout=self.timeout, port=self.port)
+        rdtype = dns.rdatatype.from_text(_type)
+        for rrset in response.answer:
+            if rrset.name == query.question[0].name and rrset.rdtype == rdtype:
+                return set(rrset)
+        return set()
+
+    def _check(self, fqdn: str, _type: str, expected: set, address: str) -> dict[str, Any]:
+        check = {"name": fqdn, "type": _type, "nameserver": address, "ok": False, "error": None}
+        start = time.monotonic()
+        for attempt in range(1, self.attempts + 1):
+            check["attempts"] = attempt
+            try:
+                served = self._query(fqdn, _type, address)
+                check["error"] = None
+                if served == expected:
+                    check["ok"] = True
+                    break
+                check["served"] = sorted(rdata.to_text() for rdata in served)
+            except (dns.exception.DNSException, OSError) as e:
+                check["error"] = str(e) or e.__class__.__name__
+            if attempt < self.attempts:
+                time.sleep(self.interval)
+        check["seconds"] = time.monotonic() - start
+        return check
+
+    def verify(self, plan: Plan, nameservers: list[str]) -> dict[str, Any]:
+        """Verify ``plan`` against ``nameservers`` and return a latency report."""
+        zone_name = plan.desired.name
+        addresses = self._addresses(self.nameservers or nameservers)
+        self.log.debug("verify: zone=%s, nameservers=%s", zone_name, addresses)
+
+        tasks = []
+        for change in plan.changes:
+            record = change.record
+            expected = set() if isinstance(change, Delete) else _rdatas(change.new)
+            for address in addresses:
+                tasks.append((record.fqdn, record._type, expected, address))
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            checks = list(executor.map(lambda task: self._check(*task), tasks))
+
+        failed = [c for c in checks if not c["ok"]]
+        report = {
+            "zone": zone_name,
+            "nameservers": addresses,
+            "seconds": time.monotonic() - start,
+            "max_seconds": max((c["seconds"] for c in checks), default=0.0),
+            "checks": checks,
+            "failed": len(failed),
+        }
+        self.log.info(
+            "verify: zone=%s, checks=%d, failed=%d, seconds=%.3f",
+            zone_name,
+            len(checks),
+            len(failed),
+            report["seconds"],
+        )
+
+        if not addresses:
+            self.log.warning("verify: zone=%s has no usable nameservers", zone_name)
+        for check in failed:
+            self.log.warning(
+                "verify: %s %s not served by %s, served=%s, error=%s",
+                check["name"],
+                check["type"],
+                check["nameserver"],
+                check.get("served"),
+                check["error"],
+            )
+        if failed and self.strict:
+            raise PropagationException(
+                f"{zone_name}: {len(failed)} of {len(checks)} propagation checks failed", report
+            )
+
+        return report
@@ -0,0 +1,21 @@
+from functools import partial
+from unittest.mock import MagicMock
+
+import pytest
+
+from .helpers import DOMAIN_LIST, get_provider
+
+
+@pytest.fixture
+def mock_client():
+    """Exoscale client knowing example.com. without any records."""
+    client = MagicMock()
+    client.list_dns_domains.return_value = DOMAIN_LIST
+    client.list_dns_domain_records.return_value = {"dns-domain-records": []}
+    return client
+
+
+@pytest.fixture
+def make_provider(mock_client):
+    """``get_provider`` bound to ``mock_client``."""
+    return partial(get_provider, mock_client)
@@ -0,0 +1,26 @@
+from unittest.mock import patch
+
+from octodns_exoscale import ExoscaleProvider
+
+ZONE_NAME = "example.com."
+ZONE_ID = "zone-id-123"
+
+DOMAIN_LIST = {
+    "dns-domains": [
+        {"id": ZONE_ID, "unicode-name": "example.com"},
+    ]
+}
+
+
+def get_provider(mock_client, records=None, domains=None, **kwargs):
+    """Build an ``ExoscaleProvider`` talking to ``mock_client``.
+
+    ``records`` and ``domains`` replace the client's canned listings, the
+    remaining kwargs are provider options.
+    """
+    if records is not None:
+        mock_client.list_dns_domain_records.return_value = {"dns-domain-records": records}
+    if domains is not None:
+        mock_client.list_dns_domains.return_value = domains
+    with patch("octodns_exoscale.Client", return_value=mock_client):
+        return ExoscaleProvider("test", "fake-key", "fake-secret", "ch-gva-2", **kwargs)
@@ -0,0 +1,231 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from octodns.provider.plan import Plan
+from octodns.record import Record
+from octodns.record.change import Create, Update
+from octodns.zone import Zone
+
+from octodns_exoscale.bootstrap import Bootstrapper
+
+from .helpers import ZONE_ID, ZONE_NAME
+
+SYSTEM_RECORDS = [
+    {
+        "id": "r-ns-1",
+        "name": "",
+        "type": "NS",
+        "content": "ns1.exoscale.ch",
+        "ttl": 3600,
+        "system-record": True,
+    },
+]
+
+
+def _zone(count):
+    zone = Zone(ZONE_NAME, [])
+    for i in range(count):
+        zone.add_record(
+            Record.new(zone, f"host{i}", {"type": "A", "ttl": 300, "value": f"10.0.0.{i}"})
+        )
+    zone.add_record(
+        Record.new(
+            zone,
+            "",
+            {"type": "MX", "ttl": 300, "value": {"preference": 10, "exchange": "mx.example.com."}},
+        )
+    )
+    return zone
+
+
+def _plan(zone):
+    return Plan(Zone(ZONE_NAME, []), zone, [Create(r) for r in zone.records], False)
+
+
+def test_bootstrap_missing_domain(mock_client, make_provider):
+    provider = make_provider(bootstrap={"workers": 3})
+    # the new domain isn't listed yet, its id comes from the operation
+    mock_client.list_dns_domains.return_value = {"dns-domains": []}
+    mock_client.create_dns_domain.return_value = {"id": "op-1", "state": "pending"}
+    mock_client.wait.return_value = {
+        "id": "op-1",
+        "state": "success",
+        "reference": {"id": ZONE_ID},
+    }
+
+    zone = _zone(10)
+    assert provider.populate(Zone(ZONE_NAME, [])) is False
+    provider._apply(_plan(zone))
+
+    mock_client.create_dns_domain.assert_called_once_with(unicode_name="example.com")
+    mock_client.wait.assert_called_once_with("op-1")
+    mock_client.list_dns_domains.assert_called_once()
+    assert mock_client.create_dns_domain_record.call_count == 11
+    mock_client.create_dns_domain_record.assert_any_call(
+        domain_id=ZONE_ID, name="host3", type="A", content="10.0.0.3", ttl=300
+    )
+    mock_client.create_dns_domain_record.assert_any_call(
+        domain_id=ZONE_ID, name="", type="MX", content="mx.example.com.", ttl=300, priority=10
+    )
+
+
+def test_bootstrap_is_bounded(mock_client, make_provider):
+    provider = make_provider(records=SYSTEM_RECORDS, bootstrap={"workers": 2, "queue_size": 3})
+    zone = _zone(50)
+    produced = []
+    lag = []
+
+    def records():
+        for record in zone.records:
+            produced.append(record)
+            yield record
+
+    mock_client.create_dns_domain_record.side_effect = lambda **kwargs: lag.append(
+        len(produced) - mock_client.create_dns_domain_record.call_count
+    )
+
+    stats = provider.bootstrap(zone, records())
+
+    assert stats["created"] == 51
+    assert max(lag) <= 3 + 2 + 1
+
+
+def test_bootstrap_resumes_from_checkpoint(tmp_path, mock_client, make_provider):
+    provider = make_provider(
+        records=SYSTEM_RECORDS, bootstrap={"workers": 1, "checkpoint_dir": str(tmp_path)}
+    )
+    zone = _zone(5)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+
+    mock_client.create_dns_domain_record.side_effect = create
+    with pytest.raises(RuntimeError):
+        provider._apply(_plan(zone))
+
+    checkpoint = tmp_path / f"{ZONE_NAME}bootstrap.jsonl"
+    assert len(checkpoint.read_text().splitlines()) == 1 + 2
+
+    mock_client.create_dns_domain_record.side_effect = None
+    mock_client.create_dns_domain_record.reset_mock()
+    stats = provider.bootstrap(zone)
+
+    assert stats == {"created": 4, "skipped": 2, "seconds": stats["seconds"]}
+    created = {c.kwargs["content"] for c in mock_client.create_dns_domain_record.call_args_list}
+    assert not created & {calls[0]["content"], calls[1]["content"]}
+    assert not os.path.exists(checkpoint)
+
+
+def test_bootstrap_skipped_for_populated_domain(mock_client, make_provider):
+    provider = make_provider(records=SYSTEM_RECORDS, bootstrap={})
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": SYSTEM_RECORDS
+        + [{"id": "r-a-1", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300}]
+    }
+
+    with patch.object(Bootstrapper, "run") as run:
+        provider._apply(_plan(_zone(2)))
+
+    run.assert_not_called()
+    assert mock_client.create_dns_domain_record.call_count == 3
+
+
+def test_bootstrap_resumes_through_plan(tmp_path, mock_client, make_provider):
+    zone = Zone(ZONE_NAME, [])
+    zone.add_record(
+        Record.new(
+            zone, "www", {"type": "A", "ttl": 300, "values": ["10.0.0.1", "10.0.0.2", "10.0.0.3"]}
+        )
+    )
+    zone.add_record(
+        Record.new(zone, "mail", {"type": "CNAME", "ttl": 300, "value": "mx.example.com."})
+    )
+
+    provider = make_provider(
+        records=SYSTEM_RECORDS, bootstrap={"workers": 1, "checkpoint_dir": str(tmp_path)}
+    )
+    created = []
+
+    def create(**kwargs):
+        if len(created) == 2:
+            raise RuntimeError("interrupted")
+        created.append(kwargs)
+
+    mock_client.create_dns_domain_record.side_effect = create
+    with pytest.raises(RuntimeError):
+        provider._apply(_plan(zone))
+
+    # a later sync sees the partially imported zone
+    remote = SYSTEM_RECORDS + [
+        {
+            "id": f"r-{i}",
+            "name": c["name"],
+            "type": c["type"],
+            "content": c["content"],
+            "ttl": c["ttl"],
+        }
+        for i, c in enumerate(created)
+    ]
+    mock_client.reset_mock(side_effect=True)
+    provider = make_provider(
+        records=remote, bootstrap={"workers": 1, "checkpoint_dir": str(tmp_path)}
+    )
+
+    plan = provider.plan(zone)
+    assert plan is not None
+    provider._apply(plan)
+
+    mock_client.delete_dns_domain_record.assert_not_called()
+    created += [c.kwargs for c in mock_client.create_dns_domain_record.call_args_list]
+    assert sorted(c["content"] for c in created) == [
+        "10.0.0.1",
+        "10.0.0.2",
+        "10.0.0.3",
+        "mx.example.com.",
+    ]
+    assert not os.path.exists(tmp_path / f"{ZONE_NAME}bootstrap.jsonl")
+
+
+def test_bootstrap_ignores_checkpoint_of_other_domain(tmp_path, make_provider):
+    checkpoint = tmp_path / f"{ZONE_NAME}bootstrap.jsonl"
+    zone = _zone(2)
+    provider = make_provider(records=SYSTEM_RECORDS, bootstrap={"checkpoint_dir": str(tmp_path)})
+    keys = [
+        json.dumps(provider._canonical_params(p))
+        for p in provider._params_for_A([r for r in zone.records if r.name == "host0"][0])
+    ]
+    checkpoint.write_text(json.dumps({"domain_id": "zone-id-old"}) + "\n" + "\n".join(keys) + "\n")
+
+    stats = provider.bootstrap(zone)
+
+    assert stats["created"] == 3
+    assert stats["skipped"] == 0
+    assert not os.path.exists(checkpoint)
+
+
+def test_bootstrap_checkpoint_discarded_by_regular_apply(tmp_path, mock_client, make_provider):
+    checkpoint = tmp_path / f"{ZONE_NAME}bootstrap.jsonl"
+    checkpoint.write_text(json.dumps({"domain_id": ZONE_ID}) + "\n")
+    provider = make_provider(records=SYSTEM_RECORDS, bootstrap={"checkpoint_dir": str(tmp_path)})
+    existing = Record.new(Zone(ZONE_NAME, []), "www", {"type": "A", "ttl": 300, "value": "1.2.3.4"})
+    new = Record.new(Zone(ZONE_NAME, []), "www", {"type": "A", "ttl": 300, "value": "5.6.7.8"})
+    zone = Zone(ZONE_NAME, [])
+    zone.add_record(new)
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": SYSTEM_RECORDS
+        + [{"id": "r-a-1", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300}]
+    }
+
+    plan = Plan(Zone(ZONE_NAME, []), zone, [Update(existing, new)], True)
+    assert not provider._bootstrappable(plan)
+    provider._apply(plan)
+
+    mock_client.delete_dns_domain_record.assert_called_once_with(
+        domain_id=ZONE_ID, record_id="r-a-1"
+    )
+    assert not os.path.exists(checkpoint)
@@ -0,0 +1,176 @@
+from octodns.record import Record
+from octodns.zone import Zone
+
+from octodns_exoscale.cache import DataCache, ZoneRecordCache
+
+TEMPLATE_DOMAINS = {
+    "dns-domains": [
+        {"id": "zone-id-1", "unicode-name": "one.com"},
+        {"id": "zone-id-2", "unicode-name": "two.com"},
+        {"id": "zone-id-3", "unicode-name": "three.com"},
+    ]
+}
+
+TEMPLATE_RECORDS = [
+    {
+        "id": "r-mx-1",
+        "name": ".",
+        "type": "MX",
+        "content": "mx.mail.com",
+        "priority": 10,
+        "ttl": 300,
+    },
+    {
+        "id": "r-mx-2",
+        "name": ".",
+        "type": "MX",
+        "content": "mx.mail.com",
+        "priority": 10,
+        "ttl": 300,
+    },
+    {"id": "r-txt-1", "name": ".", "type": "TXT", "content": "v=spf1 -all", "ttl": 300},
+]
+
+
+def test_data_cache_reused_across_zones(make_provider):
+    provider = make_provider(records=TEMPLATE_RECORDS, domains=TEMPLATE_DOMAINS)
+
+    one = Zone("one.com.", [])
+    provider.populate(one)
+    two = Zone("two.com.", [])
+    provider.populate(two)
+
+    info = provider._data_cache.info()
+    assert info["misses"] == 2
+    assert info["hits"] == 2
+    assert info["hit_rate"] == 0.5
+    assert [r.data for r in one.records] == [r.data for r in two.records]
+
+
+def test_data_cache_key_includes_priority_and_ttl(make_provider):
+    provider = make_provider(records=TEMPLATE_RECORDS, domains=TEMPLATE_DOMAINS)
+    mx = TEMPLATE_RECORDS[0]
+
+    assert provider._data_for("MX", [mx])["values"][0]["priority"] == 10
+    assert provider._data_for("MX", [dict(mx, priority=20)])["values"][0]["priority"] == 20
+    assert provider._data_for("MX", [dict(mx, ttl=60)])["ttl"] == 60
+    assert provider._data_cache.info()["misses"] == 3
+
+
+def test_data_cache_bounded():
+    cache = DataCache(maxsize=2)
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get(key, lambda: {"key": key})
+
+    info = cache.info()
+    assert info["size"] == 2
+    assert info["hits"] == 1
+    assert info["misses"] == 4
+
+
+def test_data_cache_disabled(make_provider):
+    provider = make_provider(records=TEMPLATE_RECORDS, domains=TEMPLATE_DOMAINS, data_cache_size=0)
+
+    provider.populate(Zone("one.com.", []))
+    provider.populate(Zone("two.com.", []))
+
+    info = provider._data_cache.info()
+    assert info["hits"] == 0
+    assert info["size"] == 0
+
+
+def test_zone_record_cache_max_zones():
+    evicted = []
+    cache = ZoneRecordCache(max_zones=2, on_evict=evicted.append)
+    cache["a."] = [1]
+    cache["b."] = [1]
+    cache["a."]
+    cache["c."] = [1]
+
+    assert "b." not in cache
+    assert evicted == ["b."]
+
+    cache["b."] = [1]
+    assert cache.info() == {
+        "zones": 2,
+        "records": 2,
+        "pinned": 0,
+        "evictions": 2,
+        "refetches": 1,
+    }
+
+
+def test_zone_record_cache_max_records():
+    cache = ZoneRecordCache(max_records=5)
+    cache["a."] = [1, 2]
+    cache["b."] = [1, 2]
+    cache["c."] = [1, 2, 3]
+
+    assert "a." not in cache
+    assert cache.info()["records"] == 5
+
+    # the newest zone is kept even if it's over budget on its own
+    cache["d."] = [1, 2, 3, 4, 5, 6]
+    assert list(cache._data) == ["d."]
+    assert cache.pop("d.") == [1, 2, 3, 4, 5, 6]
+    assert cache.info()["records"] == 0
+
+
+def test_zone_record_cache_pins():
+    cache = ZoneRecordCache(max_zones=3)
+    cache["hard."] = [1]
+    cache.pin("hard.", hard=True)
+    cache["soft."] = [1]
+    cache.pin("soft.")
+    cache["other."] = [1]
+    cache["last."] = [1]
+    assert list(cache._data) == ["hard.", "soft.", "last."]
+
+    cache.unpin("hard.")
+    cache["more."] = [1]
+    assert list(cache._data) == ["soft.", "last.", "more."]
+
+    # soft pins go once there's nothing else left to evict
+    cache = ZoneRecordCache(max_zones=1)
+    cache["soft."] = [1]
+    cache.pin("soft.")
+    cache["other."] = [1]
+    assert list(cache._data) == ["other."]
+
+
+def test_zone_record_cache_provider_eviction(mock_client, make_provider):
+    provider = make_provider(
+        records=TEMPLATE_RECORDS,
+        domains=TEMPLATE_DOMAINS,
+        zone_cache_max_zones=1,
+        incremental_populate=True,
+    )
+
+    provider.populate(Zone("one.com.", []))
+    provider.populate(Zone("two.com.", []))
+    assert "one.com." not in provider._zone_records
+    assert "one.com." not in provider._record_groups
+
+    provider.populate(Zone("one.com.", []))
+    assert mock_client.list_dns_domain_records.call_count == 3
+    assert provider._zone_records.info()["refetches"] == 1
+
+
+def test_zone_record_cache_plan_pins_zone(make_provider):
+    provider = make_provider(
+        records=TEMPLATE_RECORDS, domains=TEMPLATE_DOMAINS, zone_cache_max_zones=2
+    )
+
+    desired = Zone("one.com.", [])
+    desired.add_record(Record.new(desired, "www", {"type": "A", "ttl": 300, "value": "1.2.3.4"}))
+    plan = provider.plan(desired)
+    assert plan is not None
+
+    provider.populate(Zone("two.com.", []))
+    provider.populate(Zone("three.com.", []))
+    assert "one.com." in provider._zone_records
+    assert "two.com." not in provider._zone_records
+
+    provider.apply(plan)
+    assert "one.com." not in provider._zone_records
+    assert provider._zone_records.info()["pinned"] == 0
@@ -0,0 +1,87 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from octodns.zone import Zone
+
+from octodns_exoscale import ExoscaleProvider
+from octodns_exoscale.cassette import SCRUBBED, CassetteException, ReplayClient
+
+from .helpers import ZONE_NAME
+
+API_RECORDS = [
+    {"id": "r-a-1", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300},
+    {"id": "r-txt-1", "name": "key", "type": "TXT", "content": "fake-secret", "ttl": 300},
+]
+
+
+def _record(make_provider, mock_client, path):
+    mock_client.delete_dns_domain_record.side_effect = RuntimeError("not found")
+    provider = make_provider(records=API_RECORDS, cassette_record=str(path))
+
+    zone = Zone(ZONE_NAME, [])
+    provider.populate(zone)
+    with pytest.raises(RuntimeError):
+        provider._client.delete_dns_domain_record(domain_id="zone-id-123", record_id="r-a-1")
+    provider._client.close()
+    return provider, zone
+
+
+def test_record(tmp_path, make_provider, mock_client):
+    path = tmp_path / "cassette.jsonl"
+    provider, _ = _record(make_provider, mock_client, path)
+
+    interactions = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [i["method"] for i in interactions] == [
+        "list_dns_domains",
+        "list_dns_domain_records",
+        "delete_dns_domain_record",
+    ]
+    assert interactions[1]["kwargs"] == {"domain_id": "zone-id-123"}
+    assert interactions[2]["error"] == {"type": "RuntimeError", "message": "not found"}
+    assert all(i["duration"] >= 0 for i in interactions)
+    assert "fake-secret" not in path.read_text()
+    assert SCRUBBED in path.read_text()
+    assert provider._client.calls["list_dns_domain_records"] == 1
+
+
+def test_replay(tmp_path, make_provider, mock_client):
+    path = tmp_path / "cassette.jsonl"
+    _, recorded = _record(make_provider, mock_client, path)
+
+    provider = ExoscaleProvider(
+        "test", "fake-key", "fake-secret", "ch-gva-2", cassette_replay=str(path)
+    )
+    assert isinstance(provider._client, ReplayClient)
+
+    zone = Zone(ZONE_NAME, [])
+    provider.populate(zone)
+    assert {(r.name, r._type) for r in zone.records} == {
+        (r.name, r._type) for r in recorded.records
+    }
+    assert provider._client.calls == {"list_dns_domains": 1, "list_dns_domain_records": 1}
+
+    with pytest.raises(CassetteException, match="RuntimeError: not found"):
+        provider._client.delete_dns_domain_record(domain_id="zone-id-123", record_id="r-a-1")
+    with pytest.raises(CassetteException, match="no recorded interaction"):
+        provider._client.list_dns_domain_records(domain_id="other")
+
+
+def test_replay_latency(tmp_path):
+    response = {"dns-domains": []}
+    path = tmp_path / "cassette.jsonl"
+    path.write_text(
+        json.dumps(
+            {"method": "list_dns_domains", "kwargs": {}, "response": response, "duration": 2}
+        )
+        + "\n"
+    )
+    client = ReplayClient(str(path), latency=0.5)
+
+    with patch("octodns_exoscale.cassette.time.sleep") as sleep:
+        assert client.list_dns_domains() == response
+        # recordings are repeated once used up
+        assert client.list_dns_domains() == response
+
+    sleep.assert_called_with(1.0)
+    assert client.seconds == 4
@@ -0,0 +1,144 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from octodns.zone import Zone
+
+from octodns_exoscale import ExoscaleProvider
+from octodns_exoscale.hedging import (
+    DeadlineExceeded,
+    HedgedCaller,
+    LatencyTracker,
+    RunDeadlineExceeded,
+    TimeoutSession,
+)
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker(window=4)
+    assert tracker.percentile(90) is None
+    for seconds in (5, 1, 2, 3, 4):
+        tracker.add(seconds)
+
+    assert len(tracker) == 4
+    assert tracker.percentile(50) == 2
+    assert tracker.percentile(90) == 4
+    assert tracker.percentile(100) == 4
+
+
+def test_call_disabled_is_direct():
+    caller = HedgedCaller()
+    func = MagicMock(return_value="ok")
+
+    with patch("octodns_exoscale.hedging.threading.Thread") as thread:
+        assert caller.call("test", func, a=1) == "ok"
+    func.assert_called_once_with(a=1)
+    thread.assert_not_called()
+
+
+def test_call_deadline():
+    release = threading.Event()
+    caller = HedgedCaller(call_deadline=0.05)
+
+    with pytest.raises(DeadlineExceeded, match="no answer within"):
+        caller.call("slow", release.wait)
+    # the abandoned call must not keep the interpreter from exiting
+    assert all(t.daemon for t in threading.enumerate() if t.name == "hedged")
+    release.set()
+    assert caller.stats["deadlines"] == 1
+
+
+def test_call_error_propagates():
+    caller = HedgedCaller(call_deadline=1)
+
+    with pytest.raises(ValueError):
+        caller.call("fail", MagicMock(side_effect=ValueError("boom")))
+
+
+def test_call_hedged():
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(1)
+            return "slow"
+        return "fast"
+
+    caller = HedgedCaller(call_deadline=1, hedge_percentile=90, hedge_min_samples=3)
+    for _ in range(3):
+        caller.latencies["hedged"].add(0.01)
+
+    assert caller.call("hedged", func) == "fast"
+    release.set()
+    assert caller.stats["hedges"] == 1
+    assert caller.stats["hedge_wins"] == 1
+
+
+def test_run_deadline():
+    caller = HedgedCaller(run_deadline=0.01)
+    time.sleep(0.02)
+
+    with pytest.raises(RunDeadlineExceeded, match="run deadline"):
+        caller.call("late", MagicMock())
+
+    caller.start_run()
+    assert caller.call("fresh", MagicMock(return_value="ok")) == "ok"
+
+
+def test_provider_list_deadline(mock_client, make_provider):
+    release = threading.Event()
+    mock_client.list_dns_domain_records.side_effect = lambda **kwargs: release.wait(1)
+    provider = make_provider(list_deadline=0.05)
+
+    with pytest.raises(DeadlineExceeded, match=r"list_dns_domain_records\[example.com.\]"):
+        provider.populate(Zone("example.com.", []))
+    release.set()
+
+
+def test_provider_start_run(make_provider):
+    provider = make_provider(run_deadline=0.01)
+    time.sleep(0.02)
+
+    with pytest.raises(RunDeadlineExceeded):
+        provider.zones
+
+    provider.start_run()
+    assert "example.com." in provider.zones
+
+
+def test_timeout_session():
+    session = TimeoutSession(5)
+    with patch("requests.Session.request") as request:
+        session.request("GET", "https://example.com")
+        session.request("GET", "https://example.com", timeout=1)
+
+    assert request.call_args_list[0].kwargs["timeout"] == 5
+    assert request.call_args_list[1].kwargs["timeout"] == 1
+
+
+def test_provider_http_timeout():
+    provider = ExoscaleProvider("test", "fake-key", "fake-secret", "ch-gva-2", http_timeout=30)
+    session = provider._client.http_client
+    assert isinstance(session, TimeoutSession)
+    assert session.timeout == 30
+    assert session.auth is not None
+
+    # list_deadline only bounds the hedged reads, never writes
+    provider = ExoscaleProvider("test", "fake-key", "fake-secret", "ch-gva-2", list_deadline=5)
+    assert not isinstance(provider._client.http_client, TimeoutSession)
+
+
+def test_call_latencies_per_name():
+    caller = HedgedCaller(call_deadline=1, hedge_percentile=90, hedge_min_samples=3)
+    for _ in range(3):
+        caller.latencies["small"].add(0.001)
+
+    release = threading.Event()
+    slow = MagicMock(side_effect=lambda: release.wait(0.05) or "done")
+    # no history for "large" yet, the fast "small" calls don't get it hedged
+    assert caller.call("large", slow) == "done"
+    assert caller.stats["hedges"] == 0
+    assert len(caller.latencies["large"]) == 1
@@ -1,25 +1,16 @@
+import gc
+import weakref
 from unittest.mock import MagicMock, patch
 
+import pytest
+from octodns.provider import ProviderException
 from octodns.provider.plan import Plan
 from octodns.record import Record
 from octodns.record.change import Create, Delete, Update
+from octodns.record.exception import ValidationError
 from octodns.zone import Zone
 
-from octodns_exoscale import ExoscaleProvider
-
-ZONE_NAME = "example.com."
-ZONE_ID = "zone-id-123"
-
-DOMAIN_LIST = {
-    "dns-domains": [
-        {"id": ZONE_ID, "unicode-name": "example.com"},
-    ]
-}
-
-
-def _get_provider(mock_client):
-    with patch("octodns_exoscale.Client", return_value=mock_client):
-        return ExoscaleProvider("test", "fake-key", "fake-secret", "ch-gva-2")
+from .helpers import DOMAIN_LIST, ZONE_ID, ZONE_NAME, get_provider
 
 
 def _get_zone():
@@ -31,7 +22,7 @@ def _populate(mock_client, api_records):
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": api_records,
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
     zone = _get_zone()
     provider.populate(zone)
     return zone
@@ -128,7 +119,7 @@ API_RECORDS = [
 def test_zones():
     mock_client = MagicMock()
     mock_client.list_dns_domains.return_value = DOMAIN_LIST
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zones = provider.zones
     assert ZONE_NAME in zones
@@ -139,7 +130,7 @@ def test_zones():
 def test_zones_cached():
     mock_client = MagicMock()
     mock_client.list_dns_domains.return_value = DOMAIN_LIST
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     provider.zones
     provider.zones
@@ -299,7 +290,7 @@ def test_apply_create_A():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     record = Record.new(zone, "www", {"type": "A", "ttl": 300, "values": ["1.2.3.4", "5.6.7.8"]})
@@ -331,7 +322,7 @@ def test_apply_create_root_record():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     record = Record.new(zone, "", {"type": "A", "ttl": 300, "value": "1.2.3.4"})
@@ -355,7 +346,7 @@ def test_apply_create_CNAME():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     record = Record.new(
@@ -383,7 +374,7 @@ def test_apply_create_MX():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     record = Record.new(
@@ -404,8 +395,9 @@ def test_apply_create_MX():
         domain_id=ZONE_ID,
         name="",
         type="MX",
-        content="10 mail.example.com.",
+        content="mail.example.com.",
         ttl=300,
+        priority=10,
     )
 
 
@@ -415,7 +407,7 @@ def test_apply_create_SRV():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     record = Record.new(
@@ -473,7 +465,7 @@ def test_apply_delete():
             },
         ],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     provider.populate(zone)
@@ -515,7 +507,7 @@ def test_apply_delete_only_matches_name_and_type():
             },
         ],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     provider.populate(zone)
@@ -531,6 +523,30 @@ def test_apply_delete_only_matches_name_and_type():
     )
 
 
+def test_apply_delete_root_record():
+    mock_client = MagicMock()
+    mock_client.list_dns_domains.return_value = DOMAIN_LIST
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": [r for r in API_RECORDS if r["type"] == "TXT"],
+    }
+    provider = get_provider(mock_client)
+
+    zone = _get_zone()
+    provider.populate(zone)
+
+    existing = Record.new(
+        zone, "", {"type": "TXT", "ttl": 300, "value": "v=spf1 include:example.com ~all"}
+    )
+
+    change = Delete(existing)
+    plan = Plan(zone, zone, [change], True)
+    provider._apply(plan)
+
+    mock_client.delete_dns_domain_record.assert_called_once_with(
+        domain_id=ZONE_ID, record_id="r-txt-1"
+    )
+
+
 # --- Tests: _apply update ---
 
 
@@ -548,7 +564,7 @@ def test_apply_update():
             },
         ],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     provider.populate(zone)
@@ -583,7 +599,7 @@ def test_apply_clears_zone_record_cache():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     provider.populate(zone)
@@ -600,9 +616,217 @@ def test_zone_records_cached():
     mock_client.list_dns_domain_records.return_value = {
         "dns-domain-records": [],
     }
-    provider = _get_provider(mock_client)
+    provider = get_provider(mock_client)
 
     zone = _get_zone()
     provider.populate(zone)
     provider.populate(zone)
     mock_client.list_dns_domain_records.assert_called_once()
+
+
+# --- Tests: round trip normalization ---
+
+
+def test_check_round_trip_clean():
+    mock_client = MagicMock()
+    mock_client.list_dns_domains.return_value = DOMAIN_LIST
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": API_RECORDS,
+    }
+    provider = get_provider(mock_client)
+
+    assert provider.check_round_trip(_get_zone()) == []
+
+
+def test_check_round_trip_reports_churn():
+    records = [
+        {
+            "id": "r-a-1",
+            "name": "www",
+            "type": "A",
+            "content": "1.2.3.4",
+            "ttl": 300,
+        },
+        {
+            "id": "r-a-2",
+            "name": "www",
+            "type": "A",
+            "content": "5.6.7.8",
+            "ttl": 600,
+        },
+    ]
+    mock_client = MagicMock()
+    mock_client.list_dns_domains.return_value = DOMAIN_LIST
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": records,
+    }
+    provider = get_provider(mock_client)
+
+    churn = provider.check_round_trip(_get_zone())
+    assert len(churn) == 1
+    assert churn[0]["name"] == "www"
+    assert churn[0]["type"] == "A"
+    assert ("www", "A", 600, None, "5.6.7.8") in churn[0]["remote"]
+    assert ("www", "A", 300, None, "5.6.7.8") in churn[0]["round_trip"]
+
+
+def test_include_change_filters_canonical_noop():
+    provider = get_provider(MagicMock())
+    zone = _get_zone()
+
+    existing = Record.new(zone, "alias", {"type": "CNAME", "ttl": 300, "value": "WWW.example.com."})
+    new = Record.new(zone, "alias", {"type": "CNAME", "ttl": 300, "value": "www.example.com."})
+    assert not provider._include_change(Update(existing, new))
+
+    new = Record.new(zone, "alias", {"type": "CNAME", "ttl": 600, "value": "www.example.com."})
+    assert provider._include_change(Update(existing, new))
+    assert provider._include_change(Create(new))
+
+
+# --- Tests: incremental populate ---
+
+
+def test_populate_incremental_reuses_unchanged_groups(mock_client, make_provider):
+    provider = make_provider(
+        records=[r for r in API_RECORDS if r["type"] in ("A", "CNAME", "TXT")],
+        incremental_populate=True,
+    )
+
+    first = _get_zone()
+    provider.populate(first)
+    assert provider.populate_stats == {"reused": 0, "rebuilt": 3}
+
+    changed = dict(API_RECORDS[0], content="9.9.9.9")
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": [changed]
+        + [r for r in API_RECORDS[1:] if r["type"] in ("A", "CNAME", "TXT")],
+    }
+    provider._zone_records.pop(ZONE_NAME)
+
+    second = _get_zone()
+    provider.populate(second)
+    assert provider.populate_stats == {"reused": 2, "rebuilt": 4}
+
+    records = {(r.name, r._type): r for r in second.records}
+    assert sorted(records[("www", "A")].values) == ["5.6.7.8", "9.9.9.9"]
+    first_records = {(r.name, r._type): r for r in first.records}
+    assert records[("alias", "CNAME")].value is first_records[("alias", "CNAME")].value
+    assert records[("alias", "CNAME")].zone is second
+    assert records[("www", "A")] is not first_records[("www", "A")]
+
+
+def test_populate_incremental_releases_previous_zone(make_provider):
+    provider = make_provider(records=API_RECORDS[:5], incremental_populate=True)
+
+    first = _get_zone()
+    provider.populate(first)
+    ref = weakref.ref(first)
+    provider._zone_records.pop(ZONE_NAME)
+
+    second = _get_zone()
+    provider.populate(second)
+    assert provider.populate_stats["reused"] > 0
+    assert all(r.zone is second for r in second.records)
+
+    del first
+    gc.collect()
+    assert ref() is None
+
+
+def test_populate_incremental_rebuilds_lenient_groups_for_strict(make_provider):
+    provider = make_provider(
+        records=[r for r in API_RECORDS if r["type"] == "A"], incremental_populate=True
+    )
+
+    provider.populate(_get_zone(), lenient=True)
+    provider.populate(_get_zone(), lenient=True)
+    provider.populate(_get_zone())
+    assert provider.populate_stats == {"reused": 1, "rebuilt": 2}
+    provider.populate(_get_zone(), lenient=True)
+    assert provider.populate_stats == {"reused": 2, "rebuilt": 2}
+
+
+# --- Tests: trusted populate ---
+
+
+def test_populate_trusted_skips_validation(make_provider):
+    provider = make_provider(records=API_RECORDS, trusted_populate=True)
+    zone = _get_zone()
+
+    with patch.object(Record, "new", wraps=Record.new) as new:
+        provider.populate(zone)
+    new.assert_not_called()
+
+    assert len(zone.records) == len({(r["name"], r["type"]) for r in API_RECORDS})
+    record = [r for r in zone.records if r._type == "MX"][0]
+    assert record.values[0].exchange == "mail.example.com."
+
+
+def test_populate_trusted_sampled_validation(make_provider):
+    provider = make_provider(
+        records=API_RECORDS, trusted_populate=True, trusted_validation_sample=0.5
+    )
+
+    groups = len({(r["name"], r["type"]) for r in API_RECORDS})
+    with patch.object(Record, "new", wraps=Record.new) as new:
+        provider.populate(_get_zone(), lenient=True)
+    sampled = sorted((c.args[1], c.args[2]["type"]) for c in new.call_args_list)
+    assert 0 < len(sampled) < groups
+
+    # the sample is chosen per node, not by build order
+    provider = make_provider(
+        records=list(reversed(API_RECORDS)), trusted_populate=True, trusted_validation_sample=0.5
+    )
+    with patch.object(Record, "new", wraps=Record.new) as new:
+        provider.populate(_get_zone(), lenient=True)
+    assert sorted((c.args[1], c.args[2]["type"]) for c in new.call_args_list) == sampled
+
+    provider = make_provider(
+        records=API_RECORDS, trusted_populate=True, trusted_validation_sample=1
+    )
+    with pytest.raises(ValidationError):
+        provider.populate(_get_zone())
+
+
+def test_populate_malformed_content(make_provider):
+    malformed = {
+        "id": "r-caa-bad",
+        "name": ".",
+        "type": "CAA",
+        "content": "0 issue",
+        "ttl": 300,
+    }
+    provider = make_provider(records=[malformed], trusted_populate=True)
+
+    with pytest.raises(ProviderException, match="malformed CAA"):
+        provider.populate(_get_zone())
+
+    missing_priority = {
+        "id": "r-mx-bad",
+        "name": ".",
+        "type": "MX",
+        "content": "mail.example.com",
+        "ttl": 300,
+    }
+    provider = make_provider(records=[missing_priority], trusted_populate=True)
+
+    with pytest.raises(ProviderException, match="malformed MX"):
+        provider.populate(_get_zone())
+
+
+def test_apply_creates_missing_domain(mock_client, make_provider):
+    provider = make_provider(domains={"dns-domains": []})
+    mock_client.create_dns_domain.return_value = {
+        "id": "op-1",
+        "state": "success",
+        "reference": {"id": ZONE_ID},
+    }
+
+    zone = _get_zone()
+    record = Record.new(zone, "www", {"type": "A", "ttl": 300, "value": "1.2.3.4"})
+    provider._apply(Plan(None, zone, [Create(record)], True))
+
+    mock_client.wait.assert_not_called()
+    mock_client.create_dns_domain_record.assert_called_once_with(
+        domain_id=ZONE_ID, name="www", type="A", content="1.2.3.4", ttl=300
+    )
@@ -0,0 +1,84 @@
+import logging
+import os
+import pstats
+from unittest.mock import patch
+
+from octodns.provider.plan import Plan
+from octodns.record import Record
+from octodns.record.change import Create
+from octodns.zone import Zone
+
+from octodns_exoscale.profiling import _DISABLED, PROFILE_DIR_ENV, Profiler
+
+from .helpers import ZONE_NAME
+
+API_RECORDS = [
+    {"id": "r-a-1", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300},
+]
+
+
+def test_profile_populate_and_apply(tmp_path, make_provider):
+    provider = make_provider(records=API_RECORDS, profile_dir=str(tmp_path), profile_top=5)
+
+    zone = Zone(ZONE_NAME, [])
+    provider.populate(zone)
+    record = Record.new(zone, "new", {"type": "A", "ttl": 300, "value": "1.2.3.4"})
+    provider._apply(Plan(zone, zone, [Create(record)], True))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "example.com.apply.1.alloc.txt",
+        "example.com.apply.1.prof",
+        "example.com.populate.1.alloc.txt",
+        "example.com.populate.1.prof",
+    ]
+
+    stats = pstats.Stats(str(tmp_path / "example.com.populate.1.prof"))
+    functions = {name for _, _, name in stats.stats}
+    assert "_data_for_multiple" in functions
+    assert "zone_records" in functions
+
+    report = (tmp_path / "example.com.populate.1.alloc.txt").read_text()
+    assert report.startswith("elapsed: ")
+    assert len(report.split("\n\n", 1)[1].splitlines()) <= 5
+
+
+def test_profile_dir_from_env(tmp_path, monkeypatch, make_provider):
+    monkeypatch.setenv(PROFILE_DIR_ENV, str(tmp_path))
+    provider = make_provider(records=API_RECORDS)
+
+    provider.zone_records(Zone(ZONE_NAME, []))
+
+    assert "example.com.zone_records.1.prof" in os.listdir(tmp_path)
+
+
+def test_profile_disabled(monkeypatch):
+    monkeypatch.delenv(PROFILE_DIR_ENV, raising=False)
+    profiler = Profiler()
+
+    assert not profiler.enabled
+    assert profiler.phase(ZONE_NAME, "populate") is profiler.phase(ZONE_NAME, "apply")
+
+
+def test_profile_one_phase_per_process(tmp_path, caplog):
+    one = Profiler(str(tmp_path / "one"))
+    two = Profiler(str(tmp_path / "two"))
+
+    with one.phase(ZONE_NAME, "populate"):
+        with caplog.at_level(logging.DEBUG, logger="ExoscaleProfiler"):
+            assert two.phase(ZONE_NAME, "populate") is _DISABLED
+    assert "another phase is profiled" in caplog.text
+
+    with two.phase(ZONE_NAME, "populate"):
+        pass
+    assert "example.com.populate.1.prof" in os.listdir(tmp_path / "two")
+
+
+def test_profile_enable_failure_releases(tmp_path, make_provider):
+    provider = make_provider(records=API_RECORDS, profile_dir=str(tmp_path))
+
+    with patch("cProfile.Profile.enable", side_effect=ValueError("already active")):
+        provider.populate(Zone(ZONE_NAME, []))
+    assert os.listdir(tmp_path) == []
+
+    provider.populate(Zone(ZONE_NAME, []))
+    assert "example.com.populate.2.prof" in os.listdir(tmp_path)
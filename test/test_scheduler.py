@@ -0,0 +1,140 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from octodns.provider.plan import Plan
+from octodns.record import Record
+from octodns.record.change import Create, Delete
+from octodns.zone import Zone
+
+from octodns_exoscale.scheduler import ApplySchedulerException
+
+SCHEDULED_DOMAINS = {
+    "dns-domains": [
+        {"id": "big-id", "unicode-name": "big.com"},
+        {"id": "small-id", "unicode-name": "small.com"},
+    ]
+}
+
+
+def _create_plan(zone_name, count):
+    zone = Zone(zone_name, [])
+    changes = [
+        Create(Record.new(zone, f"host{i}", {"type": "A", "ttl": 300, "value": "1.2.3.4"}))
+        for i in range(count)
+    ]
+    return Plan(zone, zone, changes, True)
+
+
+def _created_domains(mock_client):
+    return [c.kwargs["domain_id"] for c in mock_client.create_dns_domain_record.call_args_list]
+
+
+def test_apply_plans_interleaves_zones(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS)
+
+    report = provider.apply_plans([_create_plan("big.com.", 5), _create_plan("small.com.", 2)])
+
+    assert _created_domains(mock_client)[:4] == ["big-id", "small-id", "big-id", "small-id"]
+    assert report["big.com."]["changes"] == 5
+    assert report["small.com."]["changes"] == 2
+    assert report["small.com."]["seconds"] <= report["big.com."]["seconds"]
+
+
+def test_apply_plans_priorities(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS, zone_priorities={"small.com": 10})
+
+    provider.apply_plans([_create_plan("big.com.", 3), _create_plan("small.com.", 2)])
+
+    assert _created_domains(mock_client) == ["small-id"] * 2 + ["big-id"] * 3
+
+
+def test_apply_plans_deletes_before_creates_per_node(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS, apply_workers=4)
+    mock_client.list_dns_domain_records.return_value = {
+        "dns-domain-records": [
+            {"id": "r-a-1", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300},
+        ]
+    }
+    calls = []
+    mock_client.delete_dns_domain_record.side_effect = lambda **kw: calls.append("delete")
+    mock_client.create_dns_domain_record.side_effect = lambda **kw: calls.append("create")
+
+    zone = Zone("big.com.", [])
+    existing = Record.new(zone, "www", {"type": "A", "ttl": 300, "value": "1.2.3.4"})
+    new = Record.new(zone, "www", {"type": "CNAME", "ttl": 300, "value": "other.big.com."})
+    plan = Plan(zone, zone, [Create(new), Delete(existing)], True)
+
+    provider.apply_plans([plan])
+
+    assert calls == ["delete", "create"]
+    mock_client.list_dns_domain_records.assert_called_once()
+
+
+def test_apply_plans_reports_failed_zone(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS)
+
+    def create(**kwargs):
+        if kwargs["domain_id"] == "big-id":
+            raise RuntimeError("boom")
+
+    mock_client.create_dns_domain_record.side_effect = create
+
+    with pytest.raises(ApplySchedulerException) as ctx:
+        provider.apply_plans([_create_plan("big.com.", 3), _create_plan("small.com.", 2)])
+
+    report = ctx.value.report
+    assert isinstance(report["big.com."]["error"], RuntimeError)
+    assert report["small.com."]["error"] is None
+    assert _created_domains(mock_client).count("big-id") == 1
+    assert _created_domains(mock_client).count("small-id") == 2
+
+
+def test_apply_plans_disabled(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS, apply_disabled=True)
+
+    assert provider.apply_plans([_create_plan("big.com.", 1)]) == {}
+    mock_client.create_dns_domain_record.assert_not_called()
+
+
+def test_apply_plans_verifies_off_the_dispatcher(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS)
+    big_created = threading.Event()
+
+    def create(**kwargs):
+        if _created_domains(mock_client).count("big-id") == 5:
+            big_created.set()
+
+    def zone_applied(plan):
+        if plan.desired.name == "small.com.":
+            # would dead-lock if big.com.'s changes had to wait for this
+            assert big_created.wait(timeout=5)
+
+    mock_client.create_dns_domain_record.side_effect = create
+    with patch.object(provider, "_zone_applied", side_effect=zone_applied):
+        report = provider.apply_plans([_create_plan("big.com.", 5), _create_plan("small.com.", 1)])
+
+    assert report["small.com."]["error"] is None
+    assert report["big.com."]["error"] is None
+
+
+def test_apply_plans_reports_failed_verification(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS)
+
+    with patch.object(provider, "_zone_applied", side_effect=RuntimeError("not served")):
+        with pytest.raises(ApplySchedulerException) as ctx:
+            provider.apply_plans([_create_plan("small.com.", 1)])
+
+    assert isinstance(ctx.value.report["small.com."]["error"], RuntimeError)
+    assert _created_domains(mock_client) == ["small-id"]
+
+
+def test_apply_plans_unpins_zones_on_early_failure(mock_client, make_provider):
+    provider = make_provider(domains=SCHEDULED_DOMAINS)
+    mock_client.create_dns_domain.side_effect = RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        provider.apply_plans([_create_plan("big.com.", 1), _create_plan("missing.com.", 1)])
+
+    assert provider._zone_records.info()["pinned"] == 0
+    mock_client.create_dns_domain_record.assert_not_called()
@@ -0,0 +1,140 @@
+from unittest.mock import patch
+
+from octodns_exoscale.snapshot import (
+    diff,
+    dump,
+    from_config,
+    main,
+    read_snapshot,
+    write_snapshot,
+)
+
+from .helpers import ZONE_NAME
+
+API_RECORDS = [
+    {"id": "r-a-1", "name": "www", "type": "A", "content": "5.6.7.8", "ttl": 300},
+    {"id": "r-a-2", "name": "www", "type": "A", "content": "1.2.3.4", "ttl": 300},
+    {
+        "id": "r-mx-1",
+        "name": ".",
+        "type": "MX",
+        "content": "mail.example.com",
+        "priority": 10,
+        "ttl": 300,
+    },
+    {
+        "id": "r-txt-1",
+        "name": "_dmarc",
+        "type": "TXT",
+        "content": "v=DMARC1; p=none",
+        "ttl": 300,
+    },
+    {"id": "r-ptr-1", "name": "x", "type": "PTR", "content": "host.example.com", "ttl": 300},
+]
+
+CONFIG = r"""---
+'':
+  type: MX
+  ttl: 300
+  value:
+    exchange: mail.example.com.
+    preference: 10
+_dmarc:
+  type: TXT
+  ttl: 300
+  value: v=DMARC1\; p=none
+www:
+  type: A
+  ttl: 300
+  values:
+    - 1.2.3.4
+    - 5.6.7.8
+"""
+
+
+def test_dump(make_provider):
+    snapshot = dump(make_provider(records=API_RECORDS))
+
+    zone = snapshot["zones"][ZONE_NAME]
+    assert zone["www"]["A"] == {"ttl": 300, "type": "A", "values": ["1.2.3.4", "5.6.7.8"]}
+    assert zone[""]["MX"]["values"] == [{"priority": 10, "exchange": "mail.example.com."}]
+    assert zone["_dmarc"]["TXT"]["values"] == ["v=DMARC1\\; p=none"]
+    assert "x" not in zone
+
+
+def test_write_read_snapshot(tmp_path, make_provider):
+    snapshot = dump(make_provider(records=API_RECORDS))
+    for filename in ("snapshot.json", "snapshot.json.gz"):
+        path = str(tmp_path / filename)
+        write_snapshot(snapshot, path)
+        assert read_snapshot(path) == snapshot
+
+
+def test_diff(make_provider):
+    old = dump(make_provider(records=API_RECORDS))
+    new = dump(make_provider(records=API_RECORDS))
+    assert diff(old, new) == []
+
+    zone = new["zones"][ZONE_NAME]
+    zone["www"]["A"] = dict(zone["www"]["A"], ttl=600)
+    del zone["_dmarc"]
+    zone["new"] = {"A": {"ttl": 300, "type": "A", "values": ["9.9.9.9"]}}
+
+    ops = [(op, name, _type) for op, _, name, _type, _, _ in diff(old, new)]
+    assert ops == [("-", "_dmarc", "TXT"), ("+", "new", "A"), ("~", "www", "A")]
+
+
+def test_diff_removed_zone(make_provider):
+    old = dump(make_provider(records=API_RECORDS))
+    new = {"version": old["version"], "zones": {}}
+
+    changes = diff(old, new)
+    assert changes
+    assert {(op, zone_name) for op, zone_name, _, _, _, _ in changes} == {("-", ZONE_NAME)}
+    assert diff(old, new, zones=["other.com."]) == []
+    assert diff(new, old) == [
+        ("+", z, name, _type, None, after) for _, z, name, _type, after, _ in changes
+    ]
+
+
+def test_from_config(tmp_path, make_provider):
+    (tmp_path / "example.com.yaml").write_text(CONFIG)
+    provider = make_provider(records=API_RECORDS)
+
+    desired = from_config(provider, str(tmp_path))
+    assert diff(dump(provider), desired) == []
+
+
+def test_main_diff(tmp_path, capsys, make_provider):
+    (tmp_path / "example.com.yaml").write_text(CONFIG.replace("5.6.7.8", "9.9.9.9"))
+    path = str(tmp_path / "snapshot.json")
+    write_snapshot(dump(make_provider(records=API_RECORDS)), path)
+
+    assert main(["diff", path, "--snapshot", path]) == 0
+    empty = str(tmp_path / "empty.json")
+    write_snapshot({"version": 1, "zones": {}}, empty)
+    assert main(["diff", path, "--snapshot", empty]) == 1
+    assert capsys.readouterr().out.startswith("- ")
+    # other.com. is only in the snapshot, not managed by the config
+    other = dump(make_provider(records=API_RECORDS))
+    other["zones"]["other.com."] = other["zones"][ZONE_NAME]
+    write_snapshot(other, path)
+    assert main(["diff", path, "--config-dir", str(tmp_path)]) == 1
+    out = capsys.readouterr().out
+    assert out.startswith("~ www.example.com. A ")
+    assert "9.9.9.9" in out
+
+
+def test_main_check(make_provider, capsys):
+    provider = make_provider(records=API_RECORDS)
+    with patch("octodns_exoscale.snapshot._provider", return_value=provider):
+        assert main(["check"]) == 0
+    assert capsys.readouterr().out == ""
+
+    mixed_ttl = dict(API_RECORDS[1], ttl=600)
+    provider = make_provider(records=[API_RECORDS[0], mixed_ttl])
+    with patch("octodns_exoscale.snapshot._provider", return_value=provider):
+        assert main(["--zone", "example.com", "check"]) == 1
+    out = capsys.readouterr().out
+    assert out.startswith("www.example.com. A ")
+    assert ZONE_NAME not in provider._zone_records
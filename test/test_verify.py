@@ -0,0 +1,168 @@
+import socket
+import threading
+from unittest.mock import patch
+
+import dns.message
+import dns.rrset
+import pytest
+from octodns.provider.plan import Plan
+from octodns.record import Record
+from octodns.record.change import Create, Delete, Update
+from octodns.zone import Zone
+
+from octodns_exoscale.verify import PropagationException, PropagationVerifier
+
+from .helpers import ZONE_NAME
+
+ROOT_NS = [
+    {"id": "r-ns-1", "name": ".", "type": "NS", "content": "127.0.0.1", "ttl": 3600},
+]
+
+
+class StandInServer:
+    """Minimal authoritative nameserver answering from a dict on 127.0.0.1."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                wire, addr = self.sock.recvfrom(4096)
+            except OSError:
+                return
+            query = dns.message.from_wire(wire)
+            question = query.question[0]
+            name = question.name.to_text()
+            _type = dns.rdatatype.to_text(question.rdtype)
+            self.queries.append((name, _type))
+            response = dns.message.make_response(query)
+            values = self.answers.get((name, _type))
+            if values:
+                response.answer.append(dns.rrset.from_text_list(name, 300, "IN", _type, values))
+            self.sock.sendto(response.to_wire(), addr)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(
+        {
+            ("www.example.com.", "A"): ["1.2.3.4", "5.6.7.8"],
+            ("example.com.", "MX"): ["10 mail.example.com."],
+            ("example.com.", "TXT"): ['"v=DMARC1; p=none"'],
+        }
+    )
+    yield server
+    server.close()
+
+
+def _verifier(server, **kwargs):
+    kwargs.setdefault("attempts", 1)
+    return PropagationVerifier(port=server.port, timeout=1, **kwargs)
+
+
+def _plan(*changes):
+    zone = Zone(ZONE_NAME, [])
+    return Plan(zone, zone, list(changes), True)
+
+
+def _record(name, data):
+    return Record.new(Zone(ZONE_NAME, []), name, data)
+
+
+def test_verify_matching(server):
+    plan = _plan(
+        Create(_record("www", {"type": "A", "ttl": 300, "values": ["5.6.7.8", "1.2.3.4"]})),
+        Create(
+            _record(
+                "",
+                {
+                    "type": "MX",
+                    "ttl": 300,
+                    "value": {"preference": 10, "exchange": "mail.example.com."},
+                },
+            )
+        ),
+        Create(_record("", {"type": "TXT", "ttl": 300, "value": "v=DMARC1\\; p=none"})),
+        Delete(_record("old", {"type": "A", "ttl": 300, "value": "1.2.3.4"})),
+    )
+
+    report = _verifier(server).verify(plan, ["127.0.0.1"])
+
+    assert report["failed"] == 0
+    assert len(report["checks"]) == 4
+    assert report["nameservers"] == ["127.0.0.1"]
+    assert ("old.example.com.", "A") in server.queries
+
+
+def test_verify_mismatch(server):
+    existing = _record("www", {"type": "A", "ttl": 300, "values": ["1.2.3.4", "5.6.7.8"]})
+    new = _record("www", {"type": "A", "ttl": 300, "value": "9.9.9.9"})
+    plan = _plan(Update(existing, new))
+
+    with patch("octodns_exoscale.verify.time.sleep") as sleep:
+        report = _verifier(server, attempts=3, interval=0.5).verify(plan, ["127.0.0.1"])
+
+    assert report["failed"] == 1
+    check = report["checks"][0]
+    assert check["attempts"] == 3
+    assert check["served"] == ["1.2.3.4", "5.6.7.8"]
+    assert sleep.call_count == 2
+
+    with pytest.raises(PropagationException) as ctx:
+        _verifier(server, strict=True).verify(plan, ["127.0.0.1"])
+    assert ctx.value.report["failed"] == 1
+
+
+def test_verify_timeout():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    try:
+        verifier = PropagationVerifier(port=sock.getsockname()[1], timeout=0.1, attempts=1)
+        plan = _plan(Create(_record("www", {"type": "A", "ttl": 300, "value": "1.2.3.4"})))
+        report = verifier.verify(plan, ["127.0.0.1"])
+    finally:
+        sock.close()
+
+    assert report["failed"] == 1
+    assert report["checks"][0]["error"]
+
+
+def test_apply_verifies_against_root_ns(server, make_provider):
+    provider = make_provider(
+        records=ROOT_NS, verify_propagation={"port": server.port, "timeout": 1, "attempts": 1}
+    )
+
+    zone = Zone(ZONE_NAME, [])
+    provider.zone_records(zone)
+    record = Record.new(zone, "www", {"type": "A", "ttl": 300, "values": ["1.2.3.4", "5.6.7.8"]})
+    provider._apply(Plan(zone, zone, [Create(record)], True))
+
+    report = provider.propagation_reports[ZONE_NAME]
+    assert report["nameservers"] == ["127.0.0.1"]
+    assert report["failed"] == 0
+    assert ZONE_NAME not in provider._zone_records
+
+
+def test_apply_strict_releases_zone_records(server, make_provider):
+    provider = make_provider(
+        records=ROOT_NS,
+        verify_propagation={"port": server.port, "timeout": 1, "attempts": 1, "strict": True},
+    )
+
+    zone = Zone(ZONE_NAME, [])
+    provider.zone_records(zone)
+    record = Record.new(zone, "www", {"type": "A", "ttl": 300, "value": "9.9.9.9"})
+    with pytest.raises(PropagationException):
+        provider._apply(Plan(zone, zone, [Create(record)], True))
+
+    assert ZONE_NAME not in provider._zone_records